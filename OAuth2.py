@@ -16,6 +16,10 @@ scope = "user-follow-read playlist-modify-public playlist-modify-private user-re
 
 sp = OAuth2Session(client_id=clientId, redirect_uri=redirectUri, scope=scope)
 
+def new_session() -> OAuth2Session:
+    # Token calls store the result on the session, so concurrent callers each need their own.
+    return OAuth2Session(client_id=clientId, redirect_uri=redirectUri, scope=scope)
+
 def create_authorization_url(state: str) -> str:
     logger.info("Creating Spotify authorization URL", extra={"event": "oauth_authorization_url_started", "state": state})
     authorization_url = sp.create_authorization_url(authorizationUrl, state=state)[0]
@@ -25,7 +29,8 @@ def create_authorization_url(state: str) -> str:
 def get_access_token(authCode: str) -> dict[str, str]:
     try:
         logger.info("Fetching Spotify access token", extra={"event": "oauth_access_token_started"})
-        token = sp.fetch_token(tokenUrl, code=authCode, client_secret=clientSecret)
+        with new_session() as session:
+            token = session.fetch_token(tokenUrl, code=authCode, client_secret=clientSecret)
         logger.info("Fetched Spotify access token", extra={"event": "oauth_access_token_succeeded"})
         return token
     except Exception:
@@ -35,7 +40,8 @@ def get_access_token(authCode: str) -> dict[str, str]:
 def refresh_access_token(refresh_token: str) -> dict[str, str]:
     try:
         logger.info("Refreshing Spotify access token", extra={"event": "oauth_refresh_token_started"})
-        token = sp.refresh_token(tokenUrl, refresh_token=refresh_token, client_secret=clientSecret)
+        with new_session() as session:
+            token = session.refresh_token(tokenUrl, refresh_token=refresh_token, client_secret=clientSecret)
         logger.info("Refreshed Spotify access token", extra={"event": "oauth_refresh_token_succeeded"})
         return token
     except Exception:
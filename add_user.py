@@ -1,6 +1,8 @@
 from dotenv import load_dotenv
-from flask import Flask, redirect, request
+from datetime import datetime
+from flask import Flask, jsonify, redirect, request
 import os
+import time
 import uuid
 import sql
 import OAuth2
@@ -14,6 +16,8 @@ configure_logging(service="server")
 logger = get_logger(__name__)
 
 users = {}
+RUN_STATUS_CACHE_SECONDS = int(os.getenv("RUN_STATUS_CACHE_SECONDS", "30"))
+run_summary_cache: tuple[float, dict] | None = None
 
 sql.init_db()
 
@@ -21,6 +25,73 @@ sql.init_db()
 def health():
     return "ok\n", 200, {"Content-Type": "text/plain; charset=utf-8"}
 
+def cached_run_summary() -> dict:
+    global run_summary_cache
+    # Scrapes and status checks share one query per cache window instead of hitting sqlite on every request.
+    if run_summary_cache is None or time.monotonic() - run_summary_cache[0] > RUN_STATUS_CACHE_SECONDS:
+        run_summary_cache = (time.monotonic(), sql.get_run_summary())
+    return run_summary_cache[1]
+
+def prometheus_metrics(summary: dict) -> str:
+    gauges = {
+        "spotinotifs_run_duration_seconds": ("Duration of the latest notifier run.", "duration_seconds"),
+        "spotinotifs_run_users": ("Users handled by the latest notifier run.", "user_count"),
+        "spotinotifs_run_failed_users": ("Users that failed in the latest notifier run.", "failed_user_count"),
+        "spotinotifs_run_requests": ("Spotify requests made by the latest notifier run.", "request_count"),
+        "spotinotifs_run_rate_limited": ("Spotify 429 responses seen by the latest notifier run.", "rate_limited_count"),
+    }
+    latest = summary["latest_runs"]
+    lines = []
+    for name, (help_text, column) in gauges.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        lines += [f'{name}{{mode="{run["mode"]}"}} {run[column] or 0}' for run in latest]
+    lines += ["# HELP spotinotifs_run_success Whether the latest notifier run finished without failures.", "# TYPE spotinotifs_run_success gauge"]
+    lines += [f'spotinotifs_run_success{{mode="{run["mode"]}"}} {int(run["status"] == "succeeded")}' for run in latest]
+    lines += ["# HELP spotinotifs_run_finished_timestamp_seconds When the latest notifier run finished.", "# TYPE spotinotifs_run_finished_timestamp_seconds gauge"]
+    lines += [
+        f'spotinotifs_run_finished_timestamp_seconds{{mode="{run["mode"]}"}} {datetime.fromisoformat(run["finished_at"]).timestamp():.3f}'
+        for run in latest
+    ]
+    lines += ["# HELP spotinotifs_run_cache_hit_ratio Cache hit ratio of the latest notifier run.", "# TYPE spotinotifs_run_cache_hit_ratio gauge"]
+    lines += [
+        f'spotinotifs_run_cache_hit_ratio{{mode="{run["mode"]}",cache="{cache}"}} {ratio}'
+        for run in latest
+        for cache, ratio in run["cache_hit_rates"].items()
+    ]
+    lines += ["# HELP spotinotifs_run_stage_duration_seconds Time spent in each stage of the latest notifier run, summed across concurrent work.", "# TYPE spotinotifs_run_stage_duration_seconds gauge"]
+    lines += [
+        f'spotinotifs_run_stage_duration_seconds{{mode="{run["mode"]}",stage="{stage}"}} {totals["duration_seconds"]}'
+        for run in latest
+        for stage, totals in run["stages"].items()
+    ]
+    lines += ["# HELP spotinotifs_run_stage_spans Times each stage ran in the latest notifier run.", "# TYPE spotinotifs_run_stage_spans gauge"]
+    lines += [
+        f'spotinotifs_run_stage_spans{{mode="{run["mode"]}",stage="{stage}"}} {totals["span_count"]}'
+        for run in latest
+        for stage, totals in run["stages"].items()
+    ]
+    lines += ["# HELP spotinotifs_runs Recorded notifier runs by outcome.", "# TYPE spotinotifs_runs gauge"]
+    lines += [f'spotinotifs_runs{{mode="{row["mode"]}",status="{row["status"]}"}} {row["run_count"]}' for row in summary["run_counts"]]
+    return "\n".join(lines) + "\n"
+
+@app.route('/metrics')
+def metrics():
+    try:
+        summary = cached_run_summary()
+    except Exception:
+        logger.exception("Run metrics query failed", extra={"event": "web_metrics_failed"})
+        return "run metrics unavailable\n", 503, {"Content-Type": "text/plain; charset=utf-8"}
+    return prometheus_metrics(summary), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+@app.route('/status')
+def status():
+    try:
+        summary = cached_run_summary()
+    except Exception:
+        logger.exception("Run status query failed", extra={"event": "web_status_failed"})
+        return jsonify({"error": "run status unavailable"}), 503
+    return jsonify(summary)
+
 @app.route('/')
 def index():
     return '''
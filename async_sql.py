@@ -0,0 +1,65 @@
+import asyncio
+import contextvars
+import functools
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import ParamSpec, TypeVar
+
+import sql
+from sql import User
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+# A single thread owns every notifier DB call, so writes keep their submission order and the event loop never waits on sqlite.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+
+
+async def run(func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+    loop = asyncio.get_running_loop()
+    # The caller's context travels with the call so log fields and trace spans still line up.
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_executor, functools.partial(context.run, func, *args, **kwargs))
+
+
+def offload(func: Callable[P, T]) -> Callable[P, Awaitable[T]]:
+    @functools.wraps(func)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        return await run(func, *args, **kwargs)
+
+    return wrapper
+
+
+async def iterate_users_one_by_one() -> list[User]:
+    return await run(lambda: list(sql.iterate_users_one_by_one()))
+
+
+get_all_users = offload(sql.get_all_users)
+get_user_by_uuid = offload(sql.get_user_by_uuid)
+get_user_by_discord_username = offload(sql.get_user_by_discord_username)
+get_user_by_username = offload(sql.get_user_by_username)
+count_users_without_discord_id = offload(sql.count_users_without_discord_id)
+update_user_access_token = offload(sql.update_user_access_token)
+update_user_discord_id = offload(sql.update_user_discord_id)
+update_user_dm_channel_id = offload(sql.update_user_dm_channel_id)
+update_user_playlist_id = offload(sql.update_user_playlist_id)
+update_user_playlist_snapshot = offload(sql.update_user_playlist_snapshot)
+clear_user_playlist_validation = offload(sql.clear_user_playlist_validation)
+update_user_items = offload(sql.update_user_items)
+record_sent_messages = offload(sql.record_sent_messages)
+get_expired_messages = offload(sql.get_expired_messages)
+delete_sent_messages = offload(sql.delete_sent_messages)
+get_artist_stats = offload(sql.get_artist_stats)
+update_artist_stats = offload(sql.update_artist_stats)
+update_artist_baselines = offload(sql.update_artist_baselines)
+get_followed_artists = offload(sql.get_followed_artists)
+replace_followed_artists = offload(sql.replace_followed_artists)
+mark_followed_artists_checked = offload(sql.mark_followed_artists_checked)
+get_watch_candidates = offload(sql.get_watch_candidates)
+get_watch_request_count = offload(sql.get_watch_request_count)
+record_watch_run = offload(sql.record_watch_run)
+get_user_stats = offload(sql.get_user_stats)
+update_user_stats = offload(sql.update_user_stats)
+get_playlist_tracks = offload(sql.get_playlist_tracks)
+update_playlist_tracks = offload(sql.update_playlist_tracks)
+record_run = offload(sql.record_run)
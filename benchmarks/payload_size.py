@@ -0,0 +1,175 @@
+import argparse
+import json
+import time
+
+# Spotify lists roughly 185 markets on every object that isn't market-scoped.
+MARKETS = [f"{chr(65 + index // 26)}{chr(65 + index % 26)}" for index in range(185)]
+
+
+def artist(index: int) -> dict:
+    artist_id = f"artist{index:016d}"
+    return {
+        "external_urls": {"spotify": f"https://open.spotify.com/artist/{artist_id}"},
+        "href": f"https://api.spotify.com/v1/artists/{artist_id}",
+        "id": artist_id,
+        "name": f"Artist {index}",
+        "type": "artist",
+        "uri": f"spotify:artist:{artist_id}",
+    }
+
+
+def images(kind: str, item_id: str) -> list[dict]:
+    return [{"url": f"https://i.scdn.co/image/{kind}{item_id}{size}", "height": size, "width": size} for size in (640, 300, 64)]
+
+
+def album(index: int, market_scoped: bool) -> dict:
+    album_id = f"album{index:017d}"
+    payload = {
+        "album_type": "single",
+        "album_group": "single",
+        "total_tracks": 2,
+        "external_urls": {"spotify": f"https://open.spotify.com/album/{album_id}"},
+        "href": f"https://api.spotify.com/v1/albums/{album_id}",
+        "id": album_id,
+        "images": images("ab67616d", album_id),
+        "name": f"Release {index}",
+        "release_date": "2025-08-21",
+        "release_date_precision": "day",
+        "type": "album",
+        "uri": f"spotify:album:{album_id}",
+        "artists": [artist(index)],
+    }
+    if market_scoped:
+        payload["is_playable"] = True
+    else:
+        payload["available_markets"] = MARKETS
+    return payload
+
+
+def track(index: int, market_scoped: bool, with_album: bool) -> dict:
+    track_id = f"track{index:017d}"
+    payload = {
+        "artists": [artist(index)],
+        "disc_number": 1,
+        "duration_ms": 180000 + index,
+        "explicit": False,
+        "external_urls": {"spotify": f"https://open.spotify.com/track/{track_id}"},
+        "href": f"https://api.spotify.com/v1/tracks/{track_id}",
+        "id": track_id,
+        "is_local": False,
+        "name": f"Track {index}",
+        "preview_url": None,
+        "track_number": 1 + index % 12,
+        "type": "track",
+        "uri": f"spotify:track:{track_id}",
+    }
+    if market_scoped:
+        payload["is_playable"] = True
+    else:
+        payload["available_markets"] = MARKETS
+    if with_album:
+        payload.update({
+            "album": album(index, market_scoped),
+            "external_ids": {"isrc": f"USXXX{index:07d}"},
+            "popularity": index % 100,
+        })
+    return payload
+
+
+def playlist_item(index: int) -> dict:
+    return {
+        "added_at": "2025-08-21T00:03:00Z",
+        "added_by": {"id": "spotinotifs", "type": "user", "uri": "spotify:user:spotinotifs"},
+        "is_local": False,
+        "track": track(index, False, True),
+    }
+
+
+def playlist(index: int, with_tracks: bool) -> dict:
+    playlist_id = f"playlist{index:014d}"
+    payload = {
+        "collaborative": False,
+        "description": "New releases from artists you follow",
+        "external_urls": {"spotify": f"https://open.spotify.com/playlist/{playlist_id}"},
+        "href": f"https://api.spotify.com/v1/playlists/{playlist_id}",
+        "id": playlist_id,
+        "images": images("ab67706c", playlist_id),
+        "name": "SpotiNotif",
+        "owner": {"display_name": "user", "id": "user", "type": "user", "uri": "spotify:user:user"},
+        "public": False,
+        "snapshot_id": "MTAsZDc2NjYzNmQ0ZDQ0ZTk5OGU5NjU5ZjA0ZjFhNzM5Y2NmYjE1ZjRiNQ==",
+        "type": "playlist",
+        "uri": f"spotify:playlist:{playlist_id}",
+    }
+    if with_tracks:
+        payload["tracks"] = {"items": [playlist_item(item) for item in range(100)], "next": None, "total": 100}
+    else:
+        payload["tracks"] = {"href": f"https://api.spotify.com/v1/playlists/{playlist_id}/tracks", "total": 100}
+    return payload
+
+
+def cases() -> list[tuple[str, dict, dict]]:
+    items = [playlist_item(index) for index in range(50)]
+    full_album = album(0, False)
+    full_album.update({
+        "copyrights": [{"text": "2025 Label", "type": "C"}, {"text": "2025 Label", "type": "P"}],
+        "external_ids": {"upc": "000000000000"},
+        "genres": [],
+        "label": "Label",
+        "popularity": 50,
+        "tracks": {"items": [track(index, False, False) for index in range(12)], "next": None, "total": 12},
+    })
+    return [
+        (
+            "playlist items (50)",
+            {"items": items, "next": "next"},
+            {"items": [{"track": {"uri": item["track"]["uri"]}} for item in items], "next": "next"},
+        ),
+        (
+            "playlist lookup",
+            playlist(0, True),
+            {"id": "playlist00000000000000", "snapshot_id": playlist(0, False)["snapshot_id"]},
+        ),
+        (
+            "my playlists (50)",
+            {"items": [playlist(index, False) for index in range(50)], "next": "next"},
+            {"items": [{"id": item["id"], "snapshot_id": item["snapshot_id"]} for item in (playlist(index, False) for index in range(50))], "next": "next"},
+        ),
+        (
+            "album tracks (12)",
+            full_album,
+            {"items": [track(index, True, False) for index in range(12)], "next": None, "total": 12},
+        ),
+        (
+            "artist albums (20)",
+            {"items": [album(index, False) for index in range(20)], "next": "next", "total": 40},
+            {"items": [album(index, True) for index in range(20)], "next": "next", "total": 40},
+        ),
+    ]
+
+
+def decode_ms(body: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        json.loads(body)
+        best = min(best, time.perf_counter() - started_at)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare full Spotify payloads with field-filtered and market-scoped ones")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for label, before, after in cases():
+        before_body = json.dumps(before).encode()
+        after_body = json.dumps(after).encode()
+        print(
+            f"{label:<20} bytes={len(before_body):>9} -> {len(after_body):>7} ({1 - len(after_body) / len(before_body):>6.1%} smaller)"
+            f"  decode={decode_ms(before_body, args.repeat):>7.3f} -> {decode_ms(after_body, args.repeat):>6.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
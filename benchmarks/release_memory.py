@@ -0,0 +1,70 @@
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from releases import Release
+
+MARKETS = ["AD", "AE", "AG", "AL", "AM", "AO", "AR", "AT", "AU", "AZ"] * 18
+
+
+def album_payload(index: int) -> dict:
+    album_id = f"{index:022d}"
+    return {
+        "album_group": "single",
+        "album_type": "single",
+        "artists": [
+            {
+                "external_urls": {"spotify": f"https://open.spotify.com/artist/{index:022d}"},
+                "href": f"https://api.spotify.com/v1/artists/{index:022d}",
+                "id": f"{index:022d}",
+                "name": f"Artist {index}",
+                "type": "artist",
+                "uri": f"spotify:artist:{index:022d}",
+            }
+        ],
+        "available_markets": MARKETS,
+        "external_urls": {"spotify": f"https://open.spotify.com/album/{album_id}"},
+        "href": f"https://api.spotify.com/v1/albums/{album_id}",
+        "id": album_id,
+        "images": [
+            {"height": size, "url": f"https://i.scdn.co/image/{album_id}{size}", "width": size}
+            for size in (640, 300, 64)
+        ],
+        "name": f"Release {index}",
+        "release_date": "2025-08-21",
+        "release_date_precision": "day",
+        "total_tracks": 1,
+        "type": "album",
+        "uri": f"spotify:album:{album_id}",
+    }
+
+
+def measure(label: str, body: bytes, loads, build) -> None:
+    gc.collect()
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    records = build(loads(body)["items"])
+    elapsed = time.perf_counter() - started_at
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<24} retained={current / 1024:>10.1f} KiB  peak={peak / 1024:>10.1f} KiB  time={elapsed * 1000:>8.1f} ms  records={len(records)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare raw album dicts with Release records")
+    parser.add_argument("--albums", type=int, default=20000)
+    args = parser.parse_args()
+
+    body = json.dumps({"items": [album_payload(index) for index in range(args.albums)]}).encode()
+    measure("dict", body, json.loads, list)
+    measure("Release", body, json.loads, lambda items: [Release.from_album(item) for item in items])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from releases import Release, ReleaseCollector
+from render import render_release_embeds, render_releases
+
+
+def legacy_split(message: str, max_length: int = 1900) -> list[str]:
+    if len(message) <= max_length:
+        return [message]
+    messages = []
+    current_message = ""
+    for line in message.split("\n"):
+        if len(current_message + line + "\n") > max_length:
+            if current_message:
+                messages.append(current_message.rstrip())
+                current_message = line + "\n"
+            else:
+                messages.append(line[: max_length - 3] + "...")
+                current_message = ""
+        else:
+            current_message += line + "\n"
+    if current_message.strip():
+        messages.append(current_message.rstrip())
+    return messages
+
+
+def legacy_render(header: str, releases: ReleaseCollector) -> list[str]:
+    message = header
+    for artist, songs in releases.by_artists().items():
+        message += f"**{artist}**\n"
+        for song in songs:
+            message += f"* [{song.name}]({song.url})\n"
+        message += "\n"
+    return legacy_split(message)
+
+
+def build_digest(release_count: int, releases_per_artist: int) -> ReleaseCollector:
+    collector = ReleaseCollector()
+    for index in range(release_count):
+        album_id = f"{index:022d}"
+        release = Release(album_id, f"Release {index}", "2025-08-21", "single", "single", f"https://open.spotify.com/album/{album_id}")
+        collector.add(f"Artist {index // releases_per_artist}", release)
+    return collector
+
+
+def measure(label: str, render, repeat: int) -> list[str]:
+    best = float("inf")
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        chunks = render()
+        best = min(best, time.perf_counter() - started_at)
+    print(f"{label:<10} time={best * 1000:>8.1f} ms  chunks={len(chunks)}  max_chunk={max(map(len, chunks))}")
+    return chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare string-concatenation rendering with the chunk builder")
+    parser.add_argument("--releases", type=int, default=10000)
+    parser.add_argument("--per-artist", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    releases = build_digest(args.releases, args.per_artist)
+    header = "New Releases! 01/01-01/31"
+    measure("legacy", lambda: legacy_render(header + "\n\n", releases), args.repeat)
+    chunks = measure("builder", lambda: render_releases([header, ""], releases), args.repeat)
+    broken = [chunk for chunk in chunks if chunk.count("[") != chunk.count("](")]
+    print(f"chunks with split links: {len(broken)}")
+    messages = render_release_embeds([header, ""], releases)
+    print(f"embed messages: {len(messages)}  embeds={sum(len(message.embeds) for message in messages)}")
+
+
+if __name__ == "__main__":
+    main()
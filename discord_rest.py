@@ -0,0 +1,80 @@
+import asyncio
+from typing import Any
+
+import aiohttp
+
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DISCORD_API_URL = "https://discord.com/api/v10"
+UNKNOWN_CHANNEL = 10003
+UNKNOWN_MESSAGE = 10008
+
+
+class DiscordRestError(Exception):
+    def __init__(self, message: str, status: int, code: int | None = None):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+class DiscordRestClient:
+    def __init__(self, token: str, max_attempts: int = 3):
+        self.token = token
+        self.max_attempts = max_attempts
+        self.session: aiohttp.ClientSession | None = None
+        self.request_count = 0
+
+    async def __aenter__(self) -> "DiscordRestClient":
+        self.session = aiohttp.ClientSession(headers={"Authorization": f"Bot {self.token}"})
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def request(self, method: str, path: str, body: dict[str, Any] | None = None) -> dict[str, Any]:
+        for attempt in range(1, self.max_attempts + 1):
+            self.request_count += 1
+            async with self.session.request(method, f"{DISCORD_API_URL}{path}", json=body) as response:
+                try:
+                    payload = await response.json(content_type=None) or {}
+                except ValueError:
+                    payload = {}
+                if response.status < 400:
+                    return payload
+                if response.status == 429 and attempt < self.max_attempts:
+                    # Discord reports the bucket's reset in the body; the header is only set for global limits.
+                    retry_after = float(payload.get("retry_after") or response.headers.get("Retry-After") or 1)
+                    logger.warning(
+                        "Discord REST request rate limited",
+                        extra={"event": "discord_rest_rate_limited", "path": path, "retry_after_seconds": retry_after, "attempt": attempt},
+                    )
+                    await asyncio.sleep(retry_after)
+                    continue
+                if response.status >= 500 and attempt < self.max_attempts:
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+                raise DiscordRestError(
+                    f"Discord {method} {path} returned {response.status}: {payload.get('message')}",
+                    response.status,
+                    payload.get("code"),
+                )
+        raise DiscordRestError(f"Discord {method} {path} exhausted retries", 429)
+
+    async def open_dm_channel(self, user_id: str) -> str:
+        response = await self.request("POST", "/users/@me/channels", {"recipient_id": user_id})
+        return response["id"]
+
+    async def create_message(self, channel_id: str, content: str | None = None, embeds: list[dict] | None = None) -> dict[str, Any]:
+        body: dict[str, Any] = {}
+        if content:
+            body["content"] = content
+        if embeds:
+            body["embeds"] = embeds
+        return await self.request("POST", f"/channels/{channel_id}/messages", body)
+
+    async def delete_message(self, channel_id: str, message_id: str) -> None:
+        await self.request("DELETE", f"/channels/{channel_id}/messages/{message_id}")
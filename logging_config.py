@@ -1,13 +1,20 @@
+import atexit
+import copy
 import json
 import logging
 import os
+import queue
 import sys
+import time
 import traceback
 import uuid
+from collections import Counter
 from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any
 
 DEFAULT_RUN_ID = os.getenv("RUN_ID", str(uuid.uuid4()))
+DEFAULT_RATE_LIMITS = "spotify_request_retry=20,spotify_request_rate_limited=20,spotify_request_server_error=20,spotify_request_circuit_open=20"
 RESERVED_RECORD_ATTRS = {
     "args",
     "asctime",
@@ -77,13 +84,120 @@ class JsonFormatter(logging.Formatter):
         return json.dumps(payload, default=str, separators=(",", ":"))
 
 
-def configure_logging(service: str | None = None, run_id: str | None = None) -> str:
+class EventRateLimitFilter(logging.Filter):
+    def __init__(self, limits: dict[str, int], window_seconds: float) -> None:
+        super().__init__()
+        self.limits = limits
+        self.window_seconds = window_seconds
+        self.window_started: dict[str, float] = {}
+        self.counts: Counter = Counter()
+        self.suppressed: Counter = Counter()
+
+    def _window_full(self, event: str) -> bool:
+        now = time.monotonic()
+        if now - self.window_started.get(event, float("-inf")) >= self.window_seconds:
+            self.window_started[event] = now
+            self.counts[event] = 0
+        return self.counts[event] >= self.limits[event]
+
+    def allows(self, event: str | None) -> bool:
+        if event not in self.limits:
+            return True
+        if self._window_full(event):
+            self.suppressed[event] += 1
+            return False
+        return True
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, "event", None)
+        if event not in self.limits or record.levelno >= logging.ERROR:
+            return True
+        if self._window_full(event):
+            self.suppressed[event] += 1
+            return False
+        self.counts[event] += 1
+        # The first record let through after a burst reports how many of its kind were dropped.
+        if self.suppressed[event]:
+            record.suppressed_count = self.suppressed.pop(event)
+        return True
+
+    def drain_suppressed(self) -> dict[str, int]:
+        suppressed = dict(self.suppressed)
+        self.suppressed.clear()
+        return suppressed
+
+
+class JsonQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike QueueHandler.prepare, keep exc_info and extras so JsonFormatter still sees them on the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+_listener: QueueListener | None = None
+_rate_limit_filter: EventRateLimitFilter | None = None
+
+
+def parse_rate_limits(spec: str) -> dict[str, int]:
+    limits = {}
+    for item in spec.split(","):
+        event, _, limit = item.strip().partition("=")
+        if event and limit.isdigit():
+            limits[event] = int(limit)
+    return limits
+
+
+def event_enabled(logger: logging.Logger, level: int, event: str) -> bool:
+    if not logger.isEnabledFor(level):
+        return False
+    return level >= logging.ERROR or _rate_limit_filter is None or _rate_limit_filter.allows(event)
+
+
+def shutdown_logging() -> None:
+    global _listener
+    if _rate_limit_filter:
+        suppressed = _rate_limit_filter.drain_suppressed()
+        if suppressed:
+            logging.getLogger(__name__).info(
+                "Suppressed log events",
+                extra={"event": "log_events_suppressed", "suppressed_counts": suppressed},
+            )
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging(service: str | None = None, run_id: str | None = None, use_queue: bool | None = None) -> str:
+    global _listener, _rate_limit_filter
     service_name = service or infer_service_name()
     current_run_id = run_id or DEFAULT_RUN_ID
     log_level = os.getenv("LOG_LEVEL", "INFO").upper()
-
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(JsonFormatter(service_name, current_run_id))
+    if use_queue is None:
+        use_queue = os.getenv("LOG_QUEUE", "false").lower() in ("1", "true", "yes")
+
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter(service_name, current_run_id))
+    if use_queue:
+        # Formatting and stdout writes move to the listener thread, off the event loop.
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _listener = QueueListener(log_queue, stream_handler)
+        _listener.start()
+        handler: logging.Handler = JsonQueueHandler(log_queue)
+    else:
+        handler = stream_handler
+
+    limits = parse_rate_limits(os.getenv("LOG_RATE_LIMITS", DEFAULT_RATE_LIMITS))
+    if limits:
+        _rate_limit_filter = EventRateLimitFilter(limits, float(os.getenv("LOG_RATE_LIMIT_WINDOW_SECONDS", "60")))
+        handler.addFilter(_rate_limit_filter)
+    else:
+        _rate_limit_filter = None
 
     root = logging.getLogger()
     root.handlers.clear()
@@ -97,3 +211,6 @@ def configure_logging(service: str | None = None, run_id: str | None = None) ->
 
 def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
+
+
+atexit.register(shutdown_logging)
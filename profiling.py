@@ -0,0 +1,106 @@
+import asyncio
+import cProfile
+import os
+import pstats
+import time
+from collections import defaultdict
+from collections.abc import Coroutine
+from pathlib import Path
+from typing import Any
+
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "25"))
+
+
+class TimedCoroutine(Coroutine):
+    __slots__ = ("coro", "name", "timings")
+
+    def __init__(self, coro: Coroutine, timings: dict[str, list]) -> None:
+        self.coro = coro
+        self.name = getattr(coro, "__qualname__", type(coro).__name__)
+        self.timings = timings
+
+    def _record(self, started_at: float) -> None:
+        timing = self.timings[self.name]
+        timing[0] += 1
+        timing[1] += time.perf_counter() - started_at
+
+    def send(self, value: Any) -> Any:
+        started_at = time.perf_counter()
+        try:
+            return self.coro.send(value)
+        finally:
+            self._record(started_at)
+
+    def throw(self, *args: Any) -> Any:
+        started_at = time.perf_counter()
+        try:
+            return self.coro.throw(*args)
+        finally:
+            self._record(started_at)
+
+    def close(self) -> None:
+        self.coro.close()
+
+    def __await__(self):
+        return self.coro.__await__()
+
+
+class NotifierProfiler:
+    def __init__(self, output_dir: str, run_id: str, top_n: int = PROFILE_TOP_N) -> None:
+        self.output_path = Path(output_dir) / f"notifier-{run_id}.prof"
+        self.top_n = top_n
+        self.profile = cProfile.Profile()
+        # Per task coroutine: [steps, seconds spent running between awaits].
+        self.coroutine_timings: dict[str, list] = defaultdict(lambda: [0, 0.0])
+
+    def start(self) -> None:
+        self.profile.enable()
+
+    def install_task_timer(self, loop: asyncio.AbstractEventLoop) -> None:
+        def task_factory(loop: asyncio.AbstractEventLoop, coro: Coroutine, **kwargs: Any) -> asyncio.Task:
+            return asyncio.Task(TimedCoroutine(coro, self.coroutine_timings), loop=loop, **kwargs)
+
+        loop.set_task_factory(task_factory)
+
+    def hot_functions(self) -> list[dict[str, Any]]:
+        stats = pstats.Stats(self.profile)
+        stats.sort_stats(pstats.SortKey.TIME)
+        hot = []
+        for function in stats.fcn_list[: self.top_n]:
+            primitive_calls, calls, total_seconds, cumulative_seconds, _ = stats.stats[function]
+            filename, line, name = function
+            hot.append({
+                "function": f"{os.path.basename(filename)}:{line}({name})",
+                "calls": calls,
+                "total_seconds": round(total_seconds, 6),
+                "cumulative_seconds": round(cumulative_seconds, 6),
+            })
+        return hot
+
+    def hot_coroutines(self) -> list[dict[str, Any]]:
+        ranked = sorted(self.coroutine_timings.items(), key=lambda item: item[1][1], reverse=True)
+        return [
+            {"coroutine": name, "steps": steps, "seconds": round(seconds, 6)}
+            for name, (steps, seconds) in ranked[: self.top_n]
+        ]
+
+    def stop(self) -> None:
+        self.profile.disable()
+        try:
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            self.profile.dump_stats(self.output_path)
+        except OSError:
+            logger.exception("Profile stats write failed", extra={"event": "profile_write_failed", "path": str(self.output_path)})
+        logger.info(
+            "Profile summary",
+            extra={
+                "event": "profile_summary",
+                "path": str(self.output_path),
+                "hot_functions": self.hot_functions(),
+                "hot_coroutines": self.hot_coroutines(),
+            },
+        )
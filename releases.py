@@ -0,0 +1,55 @@
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(slots=True, frozen=True)
+class Release:
+    id: str
+    name: str
+    release_date: str
+    album_type: str
+    album_group: str | None
+    url: str
+
+    @classmethod
+    def from_album(cls, album: dict[str, Any]) -> "Release":
+        return cls(
+            album['id'],
+            album['name'],
+            album['release_date'],
+            album['album_type'],
+            album.get('album_group'),
+            album['external_urls']['spotify'],
+        )
+
+
+class ReleaseCollector:
+    def __init__(self):
+        self.albums: dict[str, Release] = {}
+        self.album_artists: dict[str, list[str]] = {}
+        self.duplicate_count = 0
+
+    def __len__(self):
+        return len(self.albums)
+
+    def add(self, artist_name: str, album: Release) -> bool:
+        album_id = album.id
+        if album_id in self.albums:
+            self.duplicate_count += 1
+            if artist_name not in self.album_artists[album_id]:
+                self.album_artists[album_id].append(artist_name)
+            return False
+        self.albums[album_id] = album
+        self.album_artists[album_id] = [artist_name]
+        return True
+
+    def by_artists(self) -> dict[str, list[Release]]:
+        grouped: dict[str, list[Release]] = {}
+        for album_id, album in self.albums.items():
+            heading = " & ".join(self.album_artists[album_id])
+            grouped.setdefault(heading, []).append(album)
+        return grouped
+
+    def artist_count(self) -> int:
+        return len({artist for artists in self.album_artists.values() for artist in artists})
+
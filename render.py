@@ -0,0 +1,98 @@
+from dataclasses import dataclass, field
+
+from releases import Release, ReleaseCollector
+
+DISCORD_CHUNK_LENGTH = 1900
+EMBED_DESCRIPTION_LENGTH = 4096
+EMBED_MESSAGE_LENGTH = 6000
+EMBEDS_PER_MESSAGE = 10
+EMBED_COLOR = 0x1DB954
+
+
+@dataclass(slots=True)
+class RenderedMessage:
+    content: str | None = None
+    embeds: list[dict] = field(default_factory=list)
+
+
+class ChunkBuilder:
+    def __init__(self, max_length: int = DISCORD_CHUNK_LENGTH):
+        self.max_length = max_length
+        self.chunks: list[str] = []
+        self.lines: list[str] = []
+        self.length = 0
+
+    def add_line(self, line: str, reserve: int = 0) -> None:
+        if not line and not self.lines and self.chunks:
+            return
+        size = len(line) + 1
+        if size > self.max_length + 1:
+            line = line[: self.max_length - 3] + "..."
+            size = self.max_length + 1
+        # `reserve` keeps a line together with whatever must follow it, e.g. an artist heading and its first release.
+        if self.lines and self.length + size + reserve > self.max_length:
+            self.flush()
+        self.lines.append(line)
+        self.length += size
+
+    def flush(self) -> None:
+        chunk = "\n".join(self.lines).rstrip()
+        if chunk.strip():
+            self.chunks.append(chunk)
+        self.lines = []
+        self.length = 0
+
+    def finish(self) -> list[str]:
+        self.flush()
+        return self.chunks
+
+
+def release_line(release: Release, max_length: int = DISCORD_CHUNK_LENGTH) -> str:
+    line = f"* [{release.name}]({release.url})"
+    if len(line) <= max_length:
+        return line
+    # Shorten the title rather than cutting through the link target.
+    name_length = max(0, max_length - len(f"* [...]({release.url})"))
+    return f"* [{release.name[:name_length]}...]({release.url})"
+
+
+def render_releases(header_lines: list[str], releases: ReleaseCollector, max_length: int = DISCORD_CHUNK_LENGTH) -> list[str]:
+    builder = ChunkBuilder(max_length)
+    for line in header_lines:
+        builder.add_line(line)
+    add_release_groups(builder, releases)
+    return builder.finish()
+
+
+def add_release_groups(builder: ChunkBuilder, releases: ReleaseCollector) -> None:
+    for artist, songs in releases.by_artists().items():
+        lines = [release_line(song, builder.max_length) for song in songs]
+        builder.add_line(f"**{artist}**", reserve=len(lines[0]) + 1)
+        for line in lines:
+            builder.add_line(line)
+        builder.add_line("")
+
+
+def split_text(message: str, max_length: int = DISCORD_CHUNK_LENGTH) -> list[str]:
+    if len(message) <= max_length:
+        return [message]
+    builder = ChunkBuilder(max_length)
+    for line in message.split("\n"):
+        builder.add_line(line)
+    return builder.finish()
+
+
+def render_release_embeds(header_lines: list[str], releases: ReleaseCollector) -> list[RenderedMessage]:
+    # Three full descriptions fill a message's 6000 embed characters, so each embed holds a third of that.
+    builder = ChunkBuilder(min(EMBED_DESCRIPTION_LENGTH, EMBED_MESSAGE_LENGTH // 3))
+    add_release_groups(builder, releases)
+    messages = [RenderedMessage("\n".join(header_lines).strip() or None)]
+    message_length = 0
+    for description in builder.finish():
+        # Discord caps a message at 10 embeds and 6000 embed characters in total.
+        if len(messages[-1].embeds) == EMBEDS_PER_MESSAGE or message_length + len(description) > EMBED_MESSAGE_LENGTH:
+            messages.append(RenderedMessage())
+            message_length = 0
+        messages[-1].embeds.append({"description": description, "color": EMBED_COLOR})
+        message_length += len(description)
+    return messages
@@ -0,0 +1,133 @@
+import os
+import random
+import time
+from dataclasses import dataclass
+
+
+class SpotifyRequestError(Exception):
+    def __init__(self, message: str, endpoint: str, status_code: int | None = None):
+        super().__init__(message)
+        self.endpoint = endpoint
+        self.status_code = status_code
+
+
+class UserRequestFailed(SpotifyRequestError):
+    pass
+
+
+class UserThrottled(SpotifyRequestError):
+    def __init__(self, message: str, endpoint: str, retry_after: int):
+        super().__init__(message, endpoint, 429)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(SpotifyRequestError):
+    def __init__(self, message: str, endpoint: str, retry_after: int):
+        super().__init__(message, endpoint)
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class RetryDecision:
+    action: str
+    delay: float = 0.0
+    reason: str = ""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.trial_started_at: float | None = None
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        if self.trial_started_at is not None:
+            # Half-open: everyone else waits on the single trial, which is replaced if it never reports back.
+            if now - self.trial_started_at < self.reset_seconds:
+                return False
+            self.trial_started_at = now
+            return True
+        if self.opened_at is None:
+            return True
+        # After the cooldown one trial request goes through; its outcome closes or reopens the breaker.
+        if now - self.opened_at >= self.reset_seconds:
+            self.opened_at = None
+            self.failures = self.failure_threshold - 1
+            self.trial_started_at = now
+            return True
+        return False
+
+    def retry_after(self) -> float:
+        started_at = self.trial_started_at if self.trial_started_at is not None else self.opened_at
+        if started_at is None:
+            return 0.0
+        return max(0.0, self.reset_seconds - (time.monotonic() - started_at))
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial_started_at = None
+
+    def record_failure(self) -> bool:
+        self.failures += 1
+        self.trial_started_at = None
+        if self.failures >= self.failure_threshold and self.opened_at is None:
+            self.opened_at = time.monotonic()
+            return True
+        return False
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        max_retry_after: int = 60,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.breakers: dict[str, CircuitBreaker] = {}
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        return cls(
+            max_attempts=int(os.getenv("SPOTIFY_MAX_ATTEMPTS", "3")),
+            max_retry_after=int(os.getenv("SPOTIFY_MAX_RETRY_AFTER_SECONDS", "60")),
+            failure_threshold=int(os.getenv("SPOTIFY_CIRCUIT_FAILURE_THRESHOLD", "5")),
+            reset_seconds=float(os.getenv("SPOTIFY_CIRCUIT_RESET_SECONDS", "30")),
+        )
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        if endpoint not in self.breakers:
+            self.breakers[endpoint] = CircuitBreaker(self.failure_threshold, self.reset_seconds)
+        return self.breakers[endpoint]
+
+    def backoff(self, attempt: int) -> float:
+        # Full jitter keeps concurrent users from retrying in lockstep.
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def decide(self, status_code: int | None, retry_after: str | None, attempt: int) -> RetryDecision:
+        if status_code == 429:
+            seconds_to_wait = int(retry_after) if retry_after and retry_after.isdigit() else int(self.backoff(attempt)) + 1
+            if seconds_to_wait > self.max_retry_after:
+                return RetryDecision("defer", seconds_to_wait, "rate_limited")
+            if attempt >= self.max_attempts:
+                return RetryDecision("exhausted", reason="rate_limited")
+            return RetryDecision("retry", seconds_to_wait + random.uniform(0, 1), "rate_limited")
+        if status_code in (401, 403):
+            return RetryDecision("fail_user", reason="forbidden" if status_code == 403 else "unauthorized")
+        if status_code is None or 500 <= status_code < 600:
+            if attempt >= self.max_attempts:
+                return RetryDecision("exhausted", reason="server_error" if status_code else "connection_error")
+            return RetryDecision("retry", self.backoff(attempt), "server_error" if status_code else "connection_error")
+        return RetryDecision("raise", reason="client_error")
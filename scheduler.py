@@ -0,0 +1,50 @@
+import heapq
+from datetime import date
+from statistics import median
+
+DEFAULT_USER_COST_SECONDS = 60.0
+DEFAULT_RELEASE_DENSITY = 5
+
+
+def estimate_user_costs(user_ids: list[str], stats: dict[str, dict]) -> dict[str, float]:
+    known = {user_id: stats[user_id] for user_id in user_ids if user_id in stats and stats[user_id].get("duration_seconds")}
+    seconds_per_artist = [
+        stat["duration_seconds"] / stat["artist_count"] for stat in known.values() if stat.get("artist_count")
+    ]
+    fallback = median(stat["duration_seconds"] for stat in known.values()) if known else DEFAULT_USER_COST_SECONDS
+
+    costs = {}
+    for user_id in user_ids:
+        if user_id in known:
+            costs[user_id] = known[user_id]["duration_seconds"]
+        elif user_id in stats and stats[user_id].get("artist_count") and seconds_per_artist:
+            # A user with follows but no finished scan yet is scaled by the fleet's per-artist rate.
+            costs[user_id] = stats[user_id]["artist_count"] * median(seconds_per_artist)
+        else:
+            costs[user_id] = fallback
+    return costs
+
+
+def longest_job_first(user_ids: list[str], costs: dict[str, float]) -> list[str]:
+    return sorted(user_ids, key=lambda user_id: costs[user_id], reverse=True)
+
+
+def project_makespan(ordered_costs: list[float], concurrency: int) -> float:
+    workers = [0.0] * max(1, concurrency)
+    for cost in ordered_costs:
+        heapq.heapreplace(workers, workers[0] + cost)
+    return max(workers)
+
+
+def hot_artist_scores(stats: dict[str, dict], today: date) -> dict[str, float]:
+    scores = {}
+    for artist_id, stat in stats.items():
+        last_release_date = stat.get("last_release_date") or ""
+        # Year- or month-precision dates are too coarse to say an artist is active right now.
+        if len(last_release_date) != 10:
+            continue
+        days_since = (today - date.fromisoformat(last_release_date)).days
+        density = stat.get("fetch_depth") or DEFAULT_RELEASE_DENSITY
+        # A release dated in the future is the strongest hint that more is about to appear.
+        scores[artist_id] = density * 2 if days_since < 0 else density / (1 + days_since)
+    return scores
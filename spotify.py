@@ -1,18 +1,31 @@
 import sql
+import async_sql
 import OAuth2
 import aiohttp
 import requests
+from collections.abc import Awaitable, Callable
 from typing import Any
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 import discord
 from dotenv import load_dotenv
 import os
 import time
 import asyncio
 import sys
+import json
+import logging
+from collections import Counter, deque
+from contextlib import aclosing
 from urllib.parse import urlparse
 
-from logging_config import configure_logging, get_logger
+from logging_config import configure_logging, event_enabled, get_logger
+import render
+from discord_rest import UNKNOWN_CHANNEL, UNKNOWN_MESSAGE, DiscordRestClient, DiscordRestError
+import scheduler
+import tracing
+from profiling import NotifierProfiler
+from releases import Release, ReleaseCollector
+from retry_policy import CircuitOpenError, RetryPolicy, SpotifyRequestError, UserRequestFailed, UserThrottled
 
 load_dotenv()
 RUN_ID = configure_logging(service=os.getenv("SERVICE_NAME", "notifier"))
@@ -21,19 +34,65 @@ logger = get_logger(__name__)
 DISCORD_TOKEN = os.getenv("discord_token")
 bot = discord.Client(intents=discord.Intents.all())
 OWNER_DISCORD_USERNAME = os.getenv("owner_discord_username")
-SPOTIFY_SEMAPHORE = asyncio.Semaphore(1)
+SPOTIFY_SEMAPHORE = asyncio.Semaphore(int(os.getenv("SPOTIFY_CONCURRENCY", "1")))
+USER_CONCURRENCY = int(os.getenv("USER_CONCURRENCY", "1"))
+NOTIFIER_DEADLINE_SECONDS = float(os.getenv("NOTIFIER_DEADLINE_SECONDS", "0"))
+RETRY_POLICY = RetryPolicy.from_env()
+USER_FATAL_ERRORS = (UserRequestFailed, UserThrottled, CircuitOpenError)
+# These stop the user's run but are retried once the endpoint is usable again.
+USER_DEFER_ERRORS = (UserThrottled, CircuitOpenError)
+MAX_USER_DEFER_SECONDS = int(os.getenv("MAX_USER_DEFER_SECONDS", "900"))
 BREAKPOINT = 100
+PLAYLIST_WRITE_CONCURRENCY = int(os.getenv("PLAYLIST_WRITE_CONCURRENCY", "1"))
+ARTIST_TASK_WINDOW = int(os.getenv("ARTIST_TASK_WINDOW", "64"))
+TRACK_QUEUE_SIZE = 256
 is_new_day = True if datetime.now().hour < 12 else False
 catchup = False
+watch = False
+profiler: NotifierProfiler | None = None
+discord_rest_client: DiscordRestClient | None = None
 catchup_days = []
+catchup_dates: frozenset[str] = frozenset()
+CATCHUP_LOOKBACK_PAGES = 2
 notifier_started_at = time.monotonic()
+DAILY_CATEGORIES = ("album", "single", "appears_on")
+MIN_FETCH_DEPTH = 2
+DEFAULT_FETCH_DEPTH = 5
+MAX_FETCH_DEPTH = 50
+COMBINED_FULL_LIMIT = 20
+COMBINED_TOTAL_SLACK = 2
+request_counts: Counter[str] = Counter()
+user_request_counts: Counter[str] = Counter()
+user_artist_counts: dict[str, int] = {}
+response_bytes: Counter[str] = Counter()
+decode_seconds: Counter[str] = Counter()
+rate_limited_counts: Counter[str] = Counter()
+cache_hits: Counter[str] = Counter()
+cache_misses: Counter[str] = Counter()
+PLAYLIST_LIST_FIELDS = "items(id,snapshot_id),next"
+PLAYLIST_SNAPSHOT_FIELDS = "id,snapshot_id"
+PLAYLIST_VALIDATION_TTL_SECONDS = int(os.getenv("PLAYLIST_VALIDATION_TTL_SECONDS", str(12 * 60 * 60)))
+PLAYLIST_ITEMS_FIELDS = "items(track(uri)),next"
+PREFETCH_TTL_SECONDS = int(os.getenv("PREFETCH_TTL_SECONDS", str(2 * 60 * 60)))
+FOLLOWED_ARTISTS_REFRESH_SECONDS = int(os.getenv("FOLLOWED_ARTISTS_REFRESH_SECONDS", str(7 * 24 * 60 * 60)))
+TOKEN_MIN_REMAINING_SECONDS = 10 * 60
+DISCORD_DELIVERY = os.getenv("DISCORD_DELIVERY", "rest")
+MESSAGE_RETENTION_DAYS = int(os.getenv("MESSAGE_RETENTION_DAYS", "30"))
+MESSAGE_DELETE_CONCURRENCY = int(os.getenv("MESSAGE_DELETE_CONCURRENCY", "4"))
+DISCORD_EMBEDS = os.getenv("DISCORD_EMBEDS", "true").lower() in ("1", "true", "yes")
+WATCH_REQUESTS_PER_HOUR = int(os.getenv("WATCH_REQUESTS_PER_HOUR", "240"))
+WATCH_INTERVAL_MINUTES = int(os.getenv("WATCH_INTERVAL_MINUTES", "15"))
+WATCH_HOT_DAYS = int(os.getenv("WATCH_HOT_DAYS", "14"))
+PREFETCH_TOKEN_MIN_REMAINING_SECONDS = 50 * 60
 
 FOLLOWING_ARTISTS_URL  = "https://api.spotify.com/v1/me/following"
 ARTIST_ALBUMS_URL      = "https://api.spotify.com/v1/artists/{artist_id}/albums"
 ME_URL                 = "https://api.spotify.com/v1/me"
 ME_PLAYLISTS_URL       = "https://api.spotify.com/v1/me/playlists"
 ME_FOLLOW_PLAYLIST_URL = "https://api.spotify.com/v1/playlists/{playlist_id}/followers"
+PLAYLIST_FOLLOWED_URL  = "https://api.spotify.com/v1/playlists/{playlist_id}/followers/contains"
 ALBUM_URL              = "https://api.spotify.com/v1/albums/{album_id}"
+ALBUM_TRACKS_URL       = "https://api.spotify.com/v1/albums/{album_id}/tracks"
 CREATE_PLAYLIST_URL    = "https://api.spotify.com/v1/users/{user_id}/playlists"
 GET_PLAYLIST_URL       = "https://api.spotify.com/v1/playlists/{playlist_id}"
 ADD_TO_PLAYLIST_URL    = "https://api.spotify.com/v1/playlists/{playlist_id}/tracks"
@@ -51,293 +110,396 @@ def endpoint_name(url: str) -> str:
         return "spotify_current_user"
     if path == "/v1/me/playlists":
         return "spotify_playlists"
+    if path.startswith("/v1/albums/") and path.endswith("/tracks"):
+        return "spotify_album_tracks"
     if "/albums" in path:
         return "spotify_albums"
     if "/playlists" in path and "/tracks" in path:
         return "spotify_playlist_tracks"
+    if "/playlists" in path and path.endswith("/followers/contains"):
+        return "spotify_playlist_followed"
     if "/playlists" in path:
         return "spotify_playlist"
     return "spotify_api"
 
-async def spotify_request(user: sql.User, url: str, session: aiohttp.ClientSession, params: dict[str, str] | None = None) -> dict[str, Any]:
+def decode_response(url: str, body: bytes) -> Any:
+    started_at = time.perf_counter()
+    payload = json.loads(body) if body else {}
+    endpoint = endpoint_name(url)
+    response_bytes[endpoint] += len(body)
+    decode_seconds[endpoint] += time.perf_counter() - started_at
+    return payload
+
+def check_circuit(user: sql.User, url: str, method: str) -> None:
+    endpoint = endpoint_name(url)
+    breaker = RETRY_POLICY.breaker(endpoint)
+    if not breaker.allow():
+        if event_enabled(logger, logging.WARNING, "spotify_request_circuit_open"):
+            logger.warning(
+                "Spotify circuit open",
+                extra={"event": "spotify_request_circuit_open", "endpoint": endpoint, "method": method, **user_log_context(user)},
+            )
+        raise CircuitOpenError(f"Circuit open for {endpoint} while processing user {user.safe_str()}", endpoint, int(breaker.retry_after()) + 1)
+
+def handle_request_failure(user: sql.User, url: str, method: str, status_code: int | None, retry_after: str | None, attempt: int) -> float:
+    endpoint = endpoint_name(url)
+    decision = RETRY_POLICY.decide(status_code, retry_after, attempt)
+    if status_code == 429:
+        rate_limited_counts[endpoint] += 1
+
+    def log_context() -> dict[str, Any]:
+        return {"endpoint": endpoint, "method": method, "status_code": status_code, "attempt": attempt, **user_log_context(user)}
+
+    if decision.reason in ("server_error", "connection_error"):
+        if RETRY_POLICY.breaker(endpoint).record_failure():
+            logger.error("Spotify circuit opened", extra={"event": "spotify_circuit_opened", **log_context()})
+    else:
+        # Any other answer shows the endpoint is up, which also settles a half-open trial request.
+        RETRY_POLICY.breaker(endpoint).record_success()
+
+    if decision.action == "retry":
+        event = "spotify_request_rate_limited" if decision.reason == "rate_limited" else "spotify_request_server_error"
+        if event_enabled(logger, logging.WARNING, event):
+            logger.warning(
+                "Spotify request rate limited" if decision.reason == "rate_limited" else "Spotify request returned server error",
+                extra={"event": event, "retry_after_seconds": round(decision.delay, 3), **log_context()},
+            )
+        return decision.delay
+    if decision.action == "defer":
+        logger.warning("Spotify request rate limited past retry window", extra={"event": "spotify_request_deferred", "retry_after_seconds": decision.delay, **log_context()})
+        raise UserThrottled(f"Rate limited (429) for {int(decision.delay)} seconds for user {user.safe_str()}", endpoint, int(decision.delay))
+    if decision.action == "fail_user":
+        logger.error("Spotify request forbidden", extra={"event": "spotify_request_forbidden", **log_context()})
+        raise UserRequestFailed(f"API call returned {status_code} for user {user.safe_str()} at URL: {url}", endpoint, status_code)
+    if decision.action == "exhausted":
+        logger.error("Spotify request exhausted retries", extra={"event": "spotify_request_retries_exhausted", **log_context()})
+        raise SpotifyRequestError(f"Spotify request to {endpoint} exhausted retries for user {user.safe_str()}", endpoint, status_code)
+    logger.exception("Spotify request failed", extra={"event": "spotify_request_failed", **log_context()})
+    raise SpotifyRequestError(f"Spotify request to {endpoint} failed with status {status_code}", endpoint, status_code)
+
+def log_request_retry(user: sql.User, url: str, method: str, attempt: int) -> None:
+    # Retry storms are rate limited, so skip building the record once its window is full.
+    if not event_enabled(logger, logging.INFO, "spotify_request_retry"):
+        return
+    logger.info(
+        "Retrying Spotify request",
+        extra={
+            "event": "spotify_request_retry",
+            "endpoint": endpoint_name(url),
+            "method": method,
+            "attempt": attempt,
+            "max_attempts": RETRY_POLICY.max_attempts,
+            **user_log_context(user),
+        },
+    )
+
+async def spotify_request(user: sql.User, url: str, session: aiohttp.ClientSession, params: dict[str, str] | None = None, body: dict[str, Any] | None = None, method: str = "GET") -> dict[str, Any]:
     params = params or {}
     headers = {"Authorization": f"Bearer {user.access_token}"}
-    attempts = 3
-    while attempts > 0:
-        attempt_number = 4 - attempts
-        if attempts != 3:
-            logger.info(
-                "Retrying Spotify request",
-                extra={
-                    "event": "spotify_request_retry",
-                    "endpoint": endpoint_name(url),
-                    "attempt": attempt_number,
-                    "max_attempts": 3,
-                    **user_log_context(user),
-                },
-            )
+    attempt = 1
+    while True:
+        if attempt > 1:
+            log_request_retry(user, url, method, attempt)
+        check_circuit(user, url, method)
+        request_counts[endpoint_name(url)] += 1
+        user_request_counts[user.user_UUID] += 1
         try:
-            async with session.get(url, params=params, headers=headers) as response:
-                response.raise_for_status()
-                return await response.json()
+            with tracing.span("http_request", logging.DEBUG, endpoint=endpoint_name(url), method=method, attempt=attempt) as request_span:
+                async with session.request(method, url, params=params, headers=headers, json=body) as response:
+                    request_span.set(status_code=response.status)
+                    response.raise_for_status()
+                    payload = decode_response(url, await response.read())
+            RETRY_POLICY.breaker(endpoint_name(url)).record_success()
+            return payload
         except aiohttp.ClientResponseError as e:
-            if e.status == 429:
-                seconds_to_wait = int(e.headers.get('Retry-After'))  # pyright: ignore[reportArgumentType, reportOptionalMemberAccess]
-                
-                logger.warning(
-                    "Spotify request rate limited",
-                    extra={
-                        "event": "spotify_request_rate_limited",
-                        "endpoint": endpoint_name(url),
-                        "status_code": e.status,
-                        "retry_after_seconds": seconds_to_wait,
-                        "attempt": attempt_number,
-                        **user_log_context(user),
-                    },
-                )
-                if seconds_to_wait > 60:
-                    await error_message(Exception(f"Rate limited (429). Waiting {seconds_to_wait} seconds before retry... for user {user.safe_str()}"))
-                    sys.exit(1)
-                
-                await asyncio.sleep(seconds_to_wait)
-            elif e.status == 403:
-                error_msg = f"API call returned 403 Forbidden (Unauthorized) for user {user.safe_str()} at URL: {url}"
-                logger.error(
-                    "Spotify request forbidden",
-                    extra={
-                        "event": "spotify_request_forbidden",
-                        "endpoint": endpoint_name(url),
-                        "status_code": e.status,
-                        **user_log_context(user),
-                    },
-                )
-                await error_message(Exception(error_msg))
-                sys.exit(1)
-            elif 500 <= e.status < 600:
-                # Handle 500-level server errors with exponential backoff
-                wait_time = (3 - attempts) * 2  # Exponential backoff: 2, 4 seconds
-                logger.warning(
-                    "Spotify request returned server error",
-                    extra={
-                        "event": "spotify_request_server_error",
-                        "endpoint": endpoint_name(url),
-                        "status_code": e.status,
-                        "retry_after_seconds": wait_time,
-                        "attempt": attempt_number,
-                        **user_log_context(user),
-                    },
-                )
-                await asyncio.sleep(wait_time)
-                attempts -= 1
-                continue
-            else:
-                logger.exception(
-                    "Spotify request failed",
-                    extra={
-                        "event": "spotify_request_failed",
-                        "endpoint": endpoint_name(url),
-                        "status_code": e.status,
-                        "attempt": attempt_number,
-                        **user_log_context(user),
-                    },
-                )
-                raise 
-        attempts -= 1
-    logger.error(
-        "Spotify request exhausted retries",
-        extra={"event": "spotify_request_retries_exhausted", "endpoint": endpoint_name(url), **user_log_context(user)},
-    )
-    return {}
+            delay = handle_request_failure(user, url, method, e.status, e.headers.get('Retry-After') if e.headers else None, attempt)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            delay = handle_request_failure(user, url, method, None, None, attempt)
+        await asyncio.sleep(delay)
+        attempt += 1
 
+# Blocking: retries sleep in place, so coroutines must call this through asyncio.to_thread.
 def spotify_request_sync(user: sql.User, url: str, params: dict[str, str] | None = None, body: dict[str, Any] | None = None, method: str = "GET") -> dict[str, Any]:
     params = params or {}
-    body = body or {}
     headers = {"Authorization": f"Bearer {user.access_token}"}
-    attempts = 3
-    while attempts > 0:
-        attempt_number = 4 - attempts
-        if attempts != 3:
-            logger.info(
-                "Retrying Spotify request",
-                extra={
-                    "event": "spotify_request_retry",
-                    "endpoint": endpoint_name(url),
-                    "method": method,
-                    "attempt": attempt_number,
-                    "max_attempts": 3,
-                    **user_log_context(user),
-                },
-            )
+    attempt = 1
+    while True:
+        if attempt > 1:
+            log_request_retry(user, url, method, attempt)
+        check_circuit(user, url, method)
+        request_counts[endpoint_name(url)] += 1
+        user_request_counts[user.user_UUID] += 1
         try:
-            if method == "GET":
-                response = requests.get(url, params=params, headers=headers)
-            elif method == "POST":
-                response = requests.post(url, params=params, headers=headers, json=body)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-    
+            with tracing.span("http_request", logging.DEBUG, endpoint=endpoint_name(url), method=method, attempt=attempt) as request_span:
+                response = requests.request(method, url, params=params, headers=headers, json=body if method != "GET" else None)
+                request_span.set(status_code=response.status_code)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            if hasattr(e, 'response') and e.response and e.response.status_code == 429:
-                retry_after = e.response.headers.get('Retry-After')
-                seconds_to_wait = int(retry_after) if retry_after else 0
-                
-                logger.warning(
-                    "Spotify request rate limited",
-                    extra={
-                        "event": "spotify_request_rate_limited",
-                        "endpoint": endpoint_name(url),
-                        "method": method,
-                        "status_code": e.response.status_code,
-                        "retry_after_seconds": seconds_to_wait,
-                        "attempt": attempt_number,
-                        **user_log_context(user),
-                    },
-                )
-                if seconds_to_wait > 60:
-                    asyncio.run(error_message(Exception(f"Rate limited (429). Waiting {seconds_to_wait} seconds before retry... for user {user.safe_str()}")))
-                    sys.exit(1)
-                
-                time.sleep(seconds_to_wait)
-            elif hasattr(e, 'response') and e.response and e.response.status_code == 403:
-                error_msg = f"API call returned 403 Forbidden (Unauthorized) for user {user.safe_str()} at URL: {url}"
-                logger.error(
-                    "Spotify request forbidden",
-                    extra={
-                        "event": "spotify_request_forbidden",
-                        "endpoint": endpoint_name(url),
-                        "method": method,
-                        "status_code": e.response.status_code,
-                        **user_log_context(user),
-                    },
-                )
-                asyncio.run(error_message(Exception(error_msg)))
-                sys.exit(1)
-            elif hasattr(e, 'response') and e.response and 500 <= e.response.status_code < 600:
-                # Handle 500-level server errors with exponential backoff
-                wait_time = (3 - attempts) * 2  # Exponential backoff: 2, 4 seconds
-                logger.warning(
-                    "Spotify request returned server error",
-                    extra={
-                        "event": "spotify_request_server_error",
-                        "endpoint": endpoint_name(url),
-                        "method": method,
-                        "status_code": e.response.status_code,
-                        "retry_after_seconds": wait_time,
-                        "attempt": attempt_number,
-                        **user_log_context(user),
-                    },
-                )
-                time.sleep(wait_time)
-                attempts -= 1
-                continue
-            else:
-                status_code = e.response.status_code if getattr(e, "response", None) is not None else None
-                logger.exception(
-                    "Spotify request failed",
-                    extra={
-                        "event": "spotify_request_failed",
-                        "endpoint": endpoint_name(url),
-                        "method": method,
-                        "status_code": status_code,
-                        "attempt": attempt_number,
-                        **user_log_context(user),
-                    },
-                )
-                raise e
-        attempts -= 1
-    logger.error(
-        "Spotify request exhausted retries",
-        extra={"event": "spotify_request_retries_exhausted", "endpoint": endpoint_name(url), "method": method, **user_log_context(user)},
-    )
-    return {}
+            payload = decode_response(url, response.content)
+            RETRY_POLICY.breaker(endpoint_name(url)).record_success()
+            return payload
+        except requests.exceptions.HTTPError as e:
+            delay = handle_request_failure(user, url, method, e.response.status_code, e.response.headers.get('Retry-After'), attempt)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            delay = handle_request_failure(user, url, method, None, None, attempt)
+        time.sleep(delay)
+        attempt += 1
 
-def get_all_artists(user: sql.User) -> list[dict]:
+def get_followed_artists_page(user: sql.User, after: str | None = None) -> dict[str, Any]:
+    params = {
+        "type": "artist",
+        "limit": "50",
+        "after": after or ""
+    }
+    return spotify_request_sync(user, FOLLOWING_ARTISTS_URL, params)['artists']
+
+def get_all_artists(user: sql.User, first_page: dict[str, Any] | None = None) -> tuple[list[dict], bool]:
     artists = []
     next_cursor = None
     
     while True:
         try:
-            params = {
-                "type": "artist",
-                "limit": "50",
-                "after": next_cursor or ""
-            }
-            response = spotify_request_sync(user, FOLLOWING_ARTISTS_URL, params)['artists']
+            response = first_page or get_followed_artists_page(user, next_cursor)
+            first_page = None
             artists.extend(response['items'])
             next_cursor = response['cursors']['after']
-        except requests.exceptions.RequestException as e:
+        except SpotifyRequestError as e:
+            if isinstance(e, USER_FATAL_ERRORS):
+                raise
             logger.exception("Error requesting followed artists", extra={"event": "spotify_followed_artists_failed", **user_log_context(user)})
-            return artists
+            return artists, False
         if not next_cursor:
             break
     
     logger.info("Fetched followed artists", extra={"event": "spotify_followed_artists_succeeded", "artist_count": len(artists), **user_log_context(user)})
+    return artists, True
+
+async def load_followed_artists(user: sql.User, recheck: bool = False) -> list[dict]:
+    if not recheck and is_fresh(user.artists_checked_at, PREFETCH_TTL_SECONDS):
+        artists = await async_sql.get_followed_artists(user)
+        cache_hits["followed_artists"] += 1
+        logger.info("Followed artists cached", extra={"event": "spotify_followed_artists_cached", "artist_count": len(artists), **user_log_context(user)})
+        return artists
+
+    first_page = None
+    if is_fresh(user.artists_synced_at, FOLLOWED_ARTISTS_REFRESH_SECONDS):
+        stored = await async_sql.get_followed_artists(user)
+        try:
+            first_page = await asyncio.to_thread(get_followed_artists_page, user)
+        except SpotifyRequestError as e:
+            if isinstance(e, USER_FATAL_ERRORS):
+                raise
+            logger.warning("Followed artists check failed; using stored list", extra={"event": "spotify_followed_artists_check_failed", **user_log_context(user)})
+            cache_hits["followed_artists"] += 1
+            return stored
+        page_ids = [artist['id'] for artist in first_page['items']]
+        # An unchanged total and first page means the stored list is still current; swaps deeper in the list wait for the refresh interval.
+        if first_page.get('total') == len(stored) and page_ids == [artist['id'] for artist in stored[:len(page_ids)]]:
+            await async_sql.mark_followed_artists_checked(user)
+            cache_hits["followed_artists"] += 1
+            logger.info("Followed artists unchanged", extra={"event": "spotify_followed_artists_unchanged", "artist_count": len(stored), **user_log_context(user)})
+            return stored
+
+    cache_misses["followed_artists"] += 1
+    artists, complete = await asyncio.to_thread(get_all_artists, user, first_page)
+    # A partial walk is still scanned, but never persisted as the user's follow list.
+    if complete:
+        await async_sql.replace_followed_artists(user, [{"id": artist['id'], "name": artist['name']} for artist in artists])
     return artists
 
-async def get_all_albums(user: sql.User, artist_id: str, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore) -> list[str]:
+async def ensure_access_token(user: sql.User, min_remaining_seconds: int = TOKEN_MIN_REMAINING_SECONDS) -> None:
+    if user.access_token and user.access_token_expires_at and user.access_token_expires_at - time.time() > min_remaining_seconds:
+        logger.info("Spotify token reused for user", extra={"event": "spotify_access_token_cached", **user_log_context(user)})
+        cache_hits["access_token"] += 1
+        return
+    cache_misses["access_token"] += 1
+    # Token refreshes hit Spotify's accounts service, so they count against request budgets like any other call.
+    request_counts["spotify_token"] += 1
+
+    logger.info("Refreshing Spotify token for user", extra={"event": "spotify_refresh_token_started", **user_log_context(user)})
+    try:
+        token_info = await asyncio.to_thread(OAuth2.refresh_access_token, user.refresh_token)
+    except Exception:
+        logger.exception("Spotify token refresh failed", extra={"event": "spotify_refresh_token_failed", **user_log_context(user)})
+        raise
+
+    expires_at = token_info.get('expires_at') or time.time() + int(token_info.get('expires_in', 3600))
+    await async_sql.update_user_access_token(user, token_info['access_token'], float(expires_at))
+    logger.info("Spotify token refreshed for user", extra={"event": "spotify_refresh_token_succeeded", **user_log_context(user)})
+
+async def fetch_album_group(user: sql.User, artist_id: str, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, group: str, offset: int, limit: int, cutoff: str, lookback_pages: int = 0) -> list[Release]:
     albums = []
-    
-    next_url = None
+    previous_date = None
+    stale_pages = 0
     while True:
-        if next_url:
-            async with semaphore:
-                response = await spotify_request(user, next_url, session)
+        async with semaphore:
+            response = await spotify_request(user, ARTIST_ALBUMS_URL.format(artist_id=artist_id), session, {
+                "limit": str(limit),
+                "offset": str(offset),
+                "include_groups": group,
+                "market": "US"
+            })
+        items = [Release.from_album(item) for item in response.get('items', [])]
+        albums.extend(items)
+        if not items or not response.get('next'):
+            return albums
+
+        # Groups are newest first; only trust that when the page (and its join with the last page) proves it.
+        dates = [item.release_date for item in items]
+        ordered = all(a >= b for a, b in zip(dates, dates[1:])) and (previous_date is None or dates[0] <= previous_date)
+        if ordered and dates[-1] < cutoff:
+            return albums
+        if not ordered and any(date < cutoff for date in dates):
+            stale_pages += 1
+            if stale_pages > lookback_pages:
+                return albums
         else:
-            async with semaphore:
-                response = await spotify_request(user, ARTIST_ALBUMS_URL.format(artist_id=artist_id), session, {
-                    "limit": "50",
-                    "include_groups": "album,single,appears_on",
-                    "market": "US",
-                })
-        
-        for item in response['items']:
-            if item['album_type'] == "compilation":
-                continue
-            albums.append(item)
-        
-        next_url = response['next']
-        
-        if not next_url:
-            break
+            stale_pages = 0
+        previous_date = dates[-1]
+        offset += len(items)
 
-    return albums
+def pending_album_groups(items: list[Release], categories: tuple[str, ...], cutoff: str) -> tuple[list[str], Counter]:
+    seen = Counter(item.album_group for item in items)
+    group_dates: dict[str, list[str]] = {}
+    for item in items:
+        group_dates.setdefault(item.album_group, []).append(item.release_date)
+    # A group is only done when its own dates are proven newest-first and already past the cutoff;
+    # otherwise it is paged with the caller's bounded lookback.
+    resolved = {
+        group for group, dates in group_dates.items()
+        if dates[-1] < cutoff and all(a >= b for a, b in zip(dates, dates[1:]))
+    }
+    groups = [item.album_group for item in items]
+    ordered = all(group in categories for group in groups) and all(
+        categories.index(a) <= categories.index(b) for a, b in zip(groups, groups[1:])
+    )
+    if not ordered:
+        return list(categories), Counter()
+    # Groups before the last one on the page are complete; the rest still need to be reached.
+    return [group for group in categories[categories.index(groups[-1]):] if group not in resolved], seen
 
-async def recent_20_for_each_category_album(user: sql.User, artist_id: str, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore) -> list[str]:
-    albums = []
-    for category in ["album", "single", "appears_on"]:
+async def get_all_albums(user: sql.User, artist_id: str, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, earliest_date: str) -> list[Release]:
+    async with semaphore:
+        response = await spotify_request(user, ARTIST_ALBUMS_URL.format(artist_id=artist_id), session, {
+            "limit": "50",
+            "include_groups": ",".join(DAILY_CATEGORIES),
+            "market": "US",
+        })
+    items = [Release.from_album(item) for item in response.get('items', [])]
+    albums = list(items)
+
+    if response.get('next') and items:
+        pending, seen = pending_album_groups(items, DAILY_CATEGORIES, earliest_date)
+        for group in pending:
+            albums.extend(await fetch_album_group(
+                user, artist_id, session, semaphore, group, seen[group], 50, earliest_date, CATCHUP_LOOKBACK_PAGES
+            ))
+
+    unique_albums = {album.id: album for album in albums}
+    return [album for album in unique_albums.values() if album.album_type != "compilation"]
+
+def baseline_is_usable(stats: dict | None, release_date: str) -> bool:
+    return bool(
+        stats
+        and stats.get("album_total") is not None
+        and is_fresh(stats.get("total_checked_at"), PREFETCH_TTL_SECONDS)
+        and (stats.get("last_release_date") or "") < release_date
+    )
+
+async def recent_albums_for_artist(user: sql.User, artist_id: str, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, release_date: str, stats: dict | None = None) -> tuple[list[Release], dict]:
+    depth = stats["fetch_depth"] if stats and stats.get("fetch_depth") else DEFAULT_FETCH_DEPTH
+    known_total = stats.get("album_total") if stats else None
+    if baseline_is_usable(stats, release_date):
+        # A recent baseline lets one limit=1 call prove the artist has released nothing since.
         async with semaphore:
-            response = await spotify_request(user, ARTIST_ALBUMS_URL.format(artist_id=artist_id), session, {
-                "limit": "20",
-                "include_groups": category,
+            probe = await spotify_request(user, ARTIST_ALBUMS_URL.format(artist_id=artist_id), session, {
+                "limit": "1",
+                "include_groups": ",".join(DAILY_CATEGORIES),
                 "market": "US"
             })
-    
-        albums.extend(response['items'])
-    return albums
+        if probe.get('total') == known_total:
+            cache_hits["artist_baseline"] += 1
+            return [], {"album_total": None, "fetch_depth": depth, "last_release_date": None}
+    cache_misses["artist_baseline"] += 1
+    # The combined call always reaches every group; the learned depth only sizes per-group follow-up pages.
+    limit = COMBINED_FULL_LIMIT
+    if known_total is not None and known_total <= COMBINED_FULL_LIMIT:
+        limit = min(MAX_FETCH_DEPTH, max(depth, known_total + COMBINED_TOTAL_SLACK))
+
+    async with semaphore:
+        response = await spotify_request(user, ARTIST_ALBUMS_URL.format(artist_id=artist_id), session, {
+            "limit": str(limit),
+            "include_groups": ",".join(DAILY_CATEGORIES),
+            "market": "US"
+        })
+    items = [Release.from_album(item) for item in response.get('items', [])]
+    albums = list(items)
 
-async def check_playlist_exists(user: sql.User) -> bool:
-    items = []
-    next = None
+    if response.get('next') and items:
+        pending, seen = pending_album_groups(items, DAILY_CATEGORIES, release_date)
+        for group in pending:
+            albums.extend(await fetch_album_group(user, artist_id, session, semaphore, group, seen[group], depth, release_date))
+
+    unique_albums = list({album.id: album for album in albums}.values())
+    fresh_counts = Counter(album.album_group for album in unique_albums if album.release_date >= release_date)
+    needed = max(fresh_counts.values(), default=0) + 1
+    new_stats = {
+        "album_total": response.get('total'),
+        "fetch_depth": max(MIN_FETCH_DEPTH, min(MAX_FETCH_DEPTH, max(needed, (depth + needed) // 2))),
+        "last_release_date": max((album.release_date for album in unique_albums), default=None),
+    }
+    return unique_albums, new_stats
+
+def is_fresh(timestamp: str | None, ttl_seconds: int) -> bool:
+    if not timestamp:
+        return False
+    return (datetime.now(timezone.utc) - datetime.fromisoformat(timestamp)).total_seconds() < ttl_seconds
+
+def playlist_validation_is_fresh(user: sql.User) -> bool:
+    return is_fresh(user.playlist_validated_at, PLAYLIST_VALIDATION_TTL_SECONDS)
+
+def find_playlist_snapshot(user: sql.User) -> str | None:
     link = ME_PLAYLISTS_URL
     
-    while True:
-        response = spotify_request_sync(user, link, params={"limit": "50"})
-        items.extend(response['items'])
-        next = response['next']
-        link = next
-        if not next:
-            break
-    
-    for item in items:
-        if item['id'] == user.playlist_id:
-            return True
-    return False
+    while link:
+        response = spotify_request_sync(user, link, params={"limit": "50", "fields": PLAYLIST_LIST_FIELDS})
+        for item in response['items']:
+            if item['id'] == user.playlist_id:
+                return item.get('snapshot_id') or ""
+        link = response['next']
+    return None
+
+async def check_playlist_exists(user: sql.User, force: bool = False) -> bool:
+    if not force and playlist_validation_is_fresh(user):
+        logger.info("Playlist validation cached", extra={"event": "playlist_validation_cached", **user_log_context(user)})
+        cache_hits["playlist_validation"] += 1
+        return True
+    cache_misses["playlist_validation"] += 1
+
+    try:
+        response = await asyncio.to_thread(spotify_request_sync, user, GET_PLAYLIST_URL.format(playlist_id=user.playlist_id), {"fields": PLAYLIST_SNAPSHOT_FIELDS})
+        snapshot_id = response.get('snapshot_id')
+        if snapshot_id:
+            # Deleting a playlist only unfollows it and the direct lookup keeps answering, so confirm the user still follows it.
+            if await asyncio.to_thread(spotify_request_sync, user, PLAYLIST_FOLLOWED_URL.format(playlist_id=user.playlist_id)) == [False]:
+                logger.info("Configured playlist was unfollowed", extra={"event": "playlist_unfollowed", **user_log_context(user)})
+                return False
+    except SpotifyRequestError as e:
+        if isinstance(e, USER_FATAL_ERRORS):
+            raise
+        snapshot_id = None
+    if not snapshot_id:
+        # The direct lookup failed, so fall back to paging through the user's playlists.
+        logger.info("Direct playlist lookup failed", extra={"event": "playlist_direct_lookup_failed", **user_log_context(user)})
+        snapshot_id = await asyncio.to_thread(find_playlist_snapshot, user)
+        if snapshot_id is None:
+            return False
+
+    await async_sql.update_user_playlist_snapshot(user, snapshot_id, validated=True)
+    return True
 
 async def create_playlist(user: sql.User) -> str:
     logger.info("Creating Spotify playlist", extra={"event": "spotify_playlist_create_started", **user_log_context(user)})
-    response = spotify_request_sync(user, ME_URL)
+    response = await asyncio.to_thread(spotify_request_sync, user, ME_URL)
     id = response['id']
     
     body = {
@@ -346,284 +508,748 @@ async def create_playlist(user: sql.User) -> str:
         "public": True
     }
     
-    response = spotify_request_sync(user, CREATE_PLAYLIST_URL.format(user_id=id), body=body, method="POST")
+    response = await asyncio.to_thread(spotify_request_sync, user, CREATE_PLAYLIST_URL.format(user_id=id), body=body, method="POST")
     playlist_id = response['id']
     logger.info("Created Spotify playlist", extra={"event": "spotify_playlist_create_succeeded", "playlist_id": playlist_id, **user_log_context(user)})
     return playlist_id
 
-async def add_to_playlist(user: sql.User, new_releases) -> None:
-    if not user.playlist_id:
-        logger.info("Playlist update skipped", extra={"event": "playlist_update_skipped", "reason": "user_has_no_playlist", **user_log_context(user)})
-        return
-    release_count = sum(len(songs) for songs in new_releases.values())
+async def resolve_album_tracks(user: sql.User, session: aiohttp.ClientSession, album_ids: asyncio.Queue) -> list[str]:
+    uris = []
+    failure = None
+    while (album_id := await album_ids.get()) is not None:
+        # Keep draining after a failure so the scanner never blocks on a full queue.
+        if failure:
+            continue
+        try:
+            async with SPOTIFY_SEMAPHORE:
+                response = await spotify_request(user, ALBUM_TRACKS_URL.format(album_id=album_id), session, {"limit": "50", "market": "US"})
+            items = response['items']
+            next_url = response['next']
+            while next_url:
+                async with SPOTIFY_SEMAPHORE:
+                    response = await spotify_request(user, next_url, session)
+                items.extend(response['items'])
+                next_url = response['next']
+            uris.extend(item['uri'] for item in items)
+        except Exception as e:
+            failure = e
+    if failure:
+        raise failure
+    return uris
+
+async def read_playlist_track_uris(user: sql.User, session: aiohttp.ClientSession) -> set[str]:
+    uris = set()
+    offset = 0
+    while True:
+        response = await spotify_request(user, ADD_TO_PLAYLIST_URL.format(playlist_id=user.playlist_id), session, {
+            "limit": str(BREAKPOINT),
+            "offset": str(offset),
+            "fields": PLAYLIST_ITEMS_FIELDS,
+        })
+        items = response.get('items', [])
+        uris.update(item['track']['uri'] for item in items if item.get('track') and item['track'].get('uri'))
+        if not items or not response.get('next'):
+            return uris
+        offset += len(items)
+
+async def load_known_playlist_tracks(user: sql.User, session: aiohttp.ClientSession, check_snapshot: bool = False) -> tuple[set[str], bool, str | None]:
+    if check_snapshot:
+        # A cached validation never saw edits made by hand, so compare the live snapshot before trusting the known set.
+        response = await spotify_request(user, GET_PLAYLIST_URL.format(playlist_id=user.playlist_id), session, {"fields": "snapshot_id"})
+        if response.get('snapshot_id') and response['snapshot_id'] != user.playlist_snapshot_id:
+            await async_sql.update_user_playlist_snapshot(user, response['snapshot_id'])
+    synced_snapshot_id, known_uris = await async_sql.get_playlist_tracks(user.playlist_id)
+    refreshed = not user.playlist_snapshot_id or synced_snapshot_id != user.playlist_snapshot_id
+    if refreshed:
+        # The playlist changed since our last write, so rebuild the known set before skipping anything.
+        known_uris = await read_playlist_track_uris(user, session)
+        if user.playlist_snapshot_id:
+            await async_sql.update_playlist_tracks(user.playlist_id, user.playlist_snapshot_id, known_uris, replace=True)
+    return known_uris, refreshed, synced_snapshot_id
+
+async def write_playlist_tracks(user: sql.User, session: aiohttp.ClientSession, uris: list[str], check_snapshot: bool = False) -> int:
+    known_uris, refreshed, synced_snapshot_id = await load_known_playlist_tracks(user, session, check_snapshot)
+
+    new_uris = [uri for uri in dict.fromkeys(uris) if uri not in known_uris]
+    batches = [new_uris[i : i + BREAKPOINT] for i in range(0, len(new_uris), BREAKPOINT)]
+    semaphore = asyncio.Semaphore(PLAYLIST_WRITE_CONCURRENCY)
+    # A playlist rebuilt before it had a stored snapshot still needs its known set saved with the first batch.
+    replace_known = refreshed and not synced_snapshot_id
+    written_count = 0
+    failed = False
+
+    async def add_batch(batch: list[str]) -> None:
+        nonlocal replace_known, written_count, failed
+        async with semaphore:
+            # Waiting batches are dropped after a failure so the playlist never ends up with a gap in the middle.
+            if failed:
+                return
+            try:
+                response = await spotify_request(user, ADD_TO_PLAYLIST_URL.format(playlist_id=user.playlist_id), session, body={"uris": batch}, method="POST")
+            except Exception:
+                failed = True
+                raise
+            # Each applied batch is stored right away, so a later failure can't make the retry add it twice.
+            snapshot_id = response.get('snapshot_id')
+            if snapshot_id:
+                await async_sql.update_user_playlist_snapshot(user, snapshot_id)
+                await async_sql.update_playlist_tracks(user.playlist_id, snapshot_id, known_uris | set(batch) if replace_known else batch, replace=replace_known)
+                replace_known = False
+            written_count += len(batch)
+
+    # With the default single in-flight write, batches are applied in order and the last response holds the final snapshot.
+    results = await asyncio.gather(*(add_batch(batch) for batch in batches), return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if not errors and PLAYLIST_WRITE_CONCURRENCY > 1 and len(batches) > 1:
+        # Concurrent responses can arrive in any order, so ask for the snapshot the playlist actually ended on.
+        response = await spotify_request(user, GET_PLAYLIST_URL.format(playlist_id=user.playlist_id), session, {"fields": PLAYLIST_SNAPSHOT_FIELDS})
+        if response.get('snapshot_id'):
+            await async_sql.update_user_playlist_snapshot(user, response['snapshot_id'])
+            await async_sql.update_playlist_tracks(user.playlist_id, response['snapshot_id'], [])
+    logger.info(
+        "Playlist tracks written",
+        extra={
+            "event": "playlist_tracks_written",
+            "track_count": written_count,
+            "failed_track_count": len(new_uris) - written_count,
+            "skipped_track_count": len(uris) - len(new_uris),
+            "batch_count": len(batches),
+            **user_log_context(user),
+        },
+    )
+    if errors:
+        raise errors[0]
+    return written_count
+
+async def add_to_playlist(user: sql.User, release_count: int, track_resolver: asyncio.Task) -> None:
     logger.info("Playlist update started", extra={"event": "playlist_update_started", "release_count": release_count, **user_log_context(user)})
     try:
+        uris = await track_resolver
+        validation_cached = playlist_validation_is_fresh(user)
         if not await check_playlist_exists(user):
             logger.info("Configured playlist was not found", extra={"event": "playlist_missing", **user_log_context(user)})
             user.playlist_id = await create_playlist(user)
-            sql.update_user_playlist_id(user, user.playlist_id)
+            await async_sql.update_user_playlist_id(user, user.playlist_id)
 
-        uris = []
-        for _, songs in new_releases.items():
-            for song in songs.values():
-                link = song['id']
-                response = spotify_request_sync(user, ALBUM_URL.format(album_id=link))
-    
-                items = response['tracks']['items']
-                next_url = response['tracks']['next']
-                while next_url:
-                    response = spotify_request_sync(user, next_url)
-                    items.extend(response['items'])
-                    next_url = response['next']
-                uris.extend([item['uri'] for item in items])
-    
-        num_requests_required = len(uris) // BREAKPOINT + 1
-        for i in range(num_requests_required):
-            body = {"uris": uris[i * BREAKPOINT : (i + 1) * BREAKPOINT]}
-            spotify_request_sync(user, ADD_TO_PLAYLIST_URL.format(playlist_id=user.playlist_id), body=body, method="POST")
+        async with aiohttp.ClientSession() as session:
+            written_count = await write_playlist_tracks(user, session, uris, check_snapshot=validation_cached)
         logger.info(
             "Playlist update succeeded",
-            extra={"event": "playlist_update_succeeded", "release_count": release_count, "track_count": len(uris), **user_log_context(user)},
+            extra={
+                "event": "playlist_update_succeeded",
+                "release_count": release_count,
+                "track_count": len(uris),
+                "written_track_count": written_count,
+                **user_log_context(user),
+            },
         )
     except Exception as e:
         logger.exception("Playlist update failed", extra={"event": "playlist_update_failed", "release_count": release_count, **user_log_context(user)})
+        if isinstance(e, SpotifyRequestError) and e.status_code in (403, 404):
+            # A cached validation would otherwise hide the missing playlist until its TTL runs out.
+            try:
+                await async_sql.clear_user_playlist_validation(user)
+            except Exception:
+                logger.exception("Failed to clear playlist validation", extra={"event": "playlist_validation_clear_failed", **user_log_context(user)})
         await error_message(Exception(f"Error adding to playlist: {e}"))
 
-async def new_releases(user: sql.User) -> tuple[str, int]:
-    logger.info("Refreshing Spotify token for user", extra={"event": "spotify_refresh_token_started", **user_log_context(user)})
+async def iterate_completed(coros, limit: int):
+    pending = set()
     try:
-        token_info = OAuth2.refresh_access_token(user.refresh_token)
-    except Exception:
-        logger.exception("Spotify token refresh failed", extra={"event": "spotify_refresh_token_failed", **user_log_context(user)})
-        raise
-    
-    access_token = token_info['access_token']
-    user.access_token = access_token
-    logger.info("Spotify token refreshed for user", extra={"event": "spotify_refresh_token_succeeded", **user_log_context(user)})
+        for coro in coros:
+            pending.add(asyncio.ensure_future(coro))
+            if len(pending) >= limit:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task
+    finally:
+        # A consumer that stops early (e.g. a failed user) must not leave artist scans running.
+        for task in pending:
+            task.cancel()
+
+def preface_lines(preface: str | None) -> list[str]:
+    return [preface, ""] if preface else []
+
+def render_digest(header_lines: list[str], releases: ReleaseCollector) -> list[str] | list[render.RenderedMessage]:
+    if DISCORD_EMBEDS:
+        return render.render_release_embeds(header_lines, releases)
+    return render.render_releases(header_lines, releases)
+
+async def new_releases(user: sql.User, preface: str | None = None) -> tuple[list[str] | list[render.RenderedMessage], int]:
+    with tracing.span("token_refresh"):
+        await ensure_access_token(user)
     
     try:
-        artists = get_all_artists(user)
+        with tracing.span("followed_artists") as follows_span:
+            artists = await load_followed_artists(user)
+            follows_span.set(artist_count=len(artists))
+    except USER_FATAL_ERRORS:
+        raise
     except Exception as e:
         logger.exception("Error requesting artists", extra={"event": "spotify_artists_request_failed", **user_log_context(user)})
         await error_message(Exception(f"Error requesting artists: {e}"))
-        return "Error requesting artists", 0
+        return ["\n".join(preface_lines(preface) + ["Error requesting artists"])], 0
     
     artists_ids = [(artist['id'], artist['name']) for artist in artists]
+    user_artist_counts[user.user_UUID] = len(artists_ids)
     logger.info("Starting artist processing", extra={"event": "artist_processing_started", "artist_count": len(artists_ids), **user_log_context(user)})
     
-    new_releases = {}
+    new_releases = ReleaseCollector()
+    artist_stats = await async_sql.get_artist_stats([artist_id for artist_id, _ in artists_ids]) if not catchup else {}
+    updated_artist_stats = {}
+    release_date = datetime.now().strftime("%Y-%m-%d")
+    earliest_catchup_date = min(catchup_dates) if catchup else release_date
     songs_already_added = user.get_items()
     if is_new_day:
         user.reset_items()
     
-    async with aiohttp.ClientSession() as session:
-        async def process_single_artist(artist_id, artist_name):
-            if not catchup:
-                albums = await recent_20_for_each_category_album(user, artist_id, session, SPOTIFY_SEMAPHORE)
-            else:
-                albums = await get_all_albums(user, artist_id, session, SPOTIFY_SEMAPHORE)
+    with tracing.span("album_scan", artist_count=len(artists_ids)) as scan_span:
+        async with aiohttp.ClientSession() as session:
+            track_queue = asyncio.Queue(maxsize=TRACK_QUEUE_SIZE)
+            track_resolver = asyncio.create_task(resolve_album_tracks(user, session, track_queue)) if user.playlist_id else None
+
+            async def process_single_artist(artist_id, artist_name):
+                with tracing.span("artist", logging.DEBUG, artist_id=artist_id):
+                    if not catchup:
+                        albums, updated_artist_stats[artist_id] = await recent_albums_for_artist(
+                            user, artist_id, session, SPOTIFY_SEMAPHORE, release_date, artist_stats.get(artist_id)
+                        )
+                    else:
+                        albums = await get_all_albums(user, artist_id, session, SPOTIFY_SEMAPHORE, earliest_catchup_date)
 
-            new_songs = {}
+                    new_songs = []
             
-            for album in albums:
-                if not catchup:
-                    current_time = datetime.now().strftime("%Y-%m-%d")
-                
-                    if album.get('release_date') == current_time: # type: ignore
-                        album_id = album.get('id') # type: ignore
-                
-                        if album_id not in songs_already_added:
-                            user.add_item(album_id)
-                            new_songs[album_id] = album
-                else:
-                    days = [day.strftime("%Y-%m-%d") for day in catchup_days]
-
-                    if album.get('release_date') in days: # type: ignore
-                        album_id = album.get('id') # type: ignore
-                        
-                        if album_id:
-                            new_songs[album_id] = album
+                    for album in albums:
+                        if not catchup:
+                            if album.release_date == release_date:
+                                if album.id not in songs_already_added:
+                                    user.add_item(album.id)
+                                    new_songs.append(album)
+                        else:
+                            if album.release_date in catchup_dates and album.id:
+                                new_songs.append(album)
                             
-            return artist_name, new_songs if new_songs else None
+                    return artist_name, new_songs
         
-        tasks = [process_single_artist(artist_id, artist_name) for artist_id, artist_name in artists_ids]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        sql.update_user_items(user)
-        for result in results:
-            if isinstance(result, Exception):
-                logger.exception("Error processing artist", exc_info=(type(result), result, result.__traceback__), extra={"event": "artist_processing_failed", **user_log_context(user)})
-                await error_message(Exception(f"Error processing artist: {result}"))
-                continue
-            if isinstance(result, tuple) and len(result) == 2:
-                artist_name, new_songs = result
-            else:
-                logger.warning("Unexpected artist result format", extra={"event": "artist_processing_unexpected_result", **user_log_context(user)})
-                continue
-            if new_songs:
-                new_releases[artist_name] = new_songs
-    
+            tasks = (process_single_artist(artist_id, artist_name) for artist_id, artist_name in artists_ids)
+            try:
+                async with aclosing(iterate_completed(tasks, ARTIST_TASK_WINDOW)) as completed_tasks:
+                    async for task in completed_tasks:
+                        try:
+                            artist_name, new_songs = task.result()
+                        except USER_FATAL_ERRORS:
+                            raise
+                        except Exception as result:
+                            logger.exception("Error processing artist", exc_info=(type(result), result, result.__traceback__), extra={"event": "artist_processing_failed", **user_log_context(user)})
+                            await error_message(Exception(f"Error processing artist: {result}"))
+                            continue
+                        # Albums are resolved to tracks while the remaining artists are still being scanned.
+                        for song in new_songs:
+                            if new_releases.add(artist_name, song) and track_resolver:
+                                await track_queue.put(song.id)
+
+                if track_resolver:
+                    await track_queue.put(None)
+                    await asyncio.wait([track_resolver])
+            finally:
+                if track_resolver and not track_resolver.done():
+                    track_resolver.cancel()
+            scan_span.set(release_count=len(new_releases))
+            await async_sql.update_user_items(user)
+            if updated_artist_stats:
+                await async_sql.update_artist_stats(updated_artist_stats)
     
-    release_count = sum(len(songs) for songs in new_releases.values())
+    release_count = len(new_releases)
     logger.info(
         "Finished release scan",
         extra={
             "event": "release_scan_finished",
             "artist_count": len(artists_ids),
-            "artist_with_release_count": len(new_releases),
+            "artist_with_release_count": new_releases.artist_count(),
             "new_release_count": release_count,
+            "duplicate_release_count": new_releases.duplicate_count,
             **user_log_context(user),
         },
     )
-    message = ""
     if len(new_releases) > 0:
+        header_lines = preface_lines(preface)
         if catchup:
-            message += f"New Releases! {catchup_days[0].strftime('%m/%d')}-{catchup_days[-1].strftime('%m/%d')}\n\n"
-            for artist, songs in new_releases.items():
-                message += f"**{artist}**\n"
-                for song in songs.values():
-                    message += f"* [{song['name']}]({song['external_urls']['spotify']})\n"
-                message += "\n"
-        else:    
-            if is_new_day:
-                message += f"New Releases! {datetime.now().strftime('%m/%d')}\n\n"
-            else:
-                message += f"New Releases! {datetime.now().strftime('%m/%d')}\n\n" + "Strays from today:\n"
-            for artist, songs in new_releases.items():
-                message += f"**{artist}**\n"
-                for song in songs.values():
-                    message += f"* [{song['name']}]({song['external_urls']['spotify']})\n"
-                message += "\n"
+            header_lines += [f"New Releases! {catchup_days[0].strftime('%m/%d')}-{catchup_days[-1].strftime('%m/%d')}", ""]
+        else:
+            header_lines += [f"New Releases! {datetime.now().strftime('%m/%d')}", ""]
+            if not is_new_day:
+                header_lines.append("Strays from today:")
+        messages = render_digest(header_lines, new_releases)
         
-        await add_to_playlist(user, new_releases)
-    else:
-        if is_new_day:
-            message += f"No new releases today! {datetime.now().strftime('%m/%d')}\n\n"
+        if track_resolver:
+            with tracing.span("playlist_write", release_count=release_count):
+                await add_to_playlist(user, release_count, track_resolver)
         else:
-            message += f"No strays today! {datetime.now().strftime('%m/%d')}\n\n"
-    return message, release_count
+            logger.info("Playlist update skipped", extra={"event": "playlist_update_skipped", "reason": "user_has_no_playlist", **user_log_context(user)})
+    elif is_new_day:
+        messages = ["\n".join(preface_lines(preface) + [f"No new releases today! {datetime.now().strftime('%m/%d')}"])]
+    else:
+        messages = ["\n".join(preface_lines(preface) + [f"No strays today! {datetime.now().strftime('%m/%d')}"])]
+    return messages, release_count
 
-async def process_user(user: sql.User) -> tuple[bool, int]:
+async def process_user(user: sql.User, requeued: bool = False) -> tuple[bool, int]:
     user_started_at = time.monotonic()
-    logger.info("User processing started", extra={"event": "user_processing_started", **user_log_context(user)})
-    if catchup:
-        await send_message(user, "Catching up on all songs missed due to the bot outage! Apologies for the delay.")
-    else:
-        if is_new_day:
-            await send_message(user, "Finding new releases for the day!")
+    logger.info("User processing started", extra={"event": "user_processing_started", "requeued": requeued, **user_log_context(user)})
+    # The preface rides along with the results instead of costing its own DM.
+    preface = None
+    if not requeued:
+        if catchup:
+            preface = "Catching up on all songs missed due to the bot outage! Apologies for the delay."
+        elif is_new_day:
+            preface = "Finding new releases for the day!"
         else:
-            await send_message(user, "Catching up on any strays from today!")
+            preface = "Catching up on any strays from today!"
     
     try:
-        message, release_count = await new_releases(user)
-        await send_message(user, message)
+        messages, release_count = await new_releases(user, preface)
+        with tracing.span("discord_send"):
+            await send_message(user, messages)
+        duration_seconds = round(time.monotonic() - user_started_at, 3)
         logger.info(
             "User processing finished",
             extra={
                 "event": "user_processing_finished",
                 "status": "succeeded",
-                "duration_seconds": round(time.monotonic() - user_started_at, 3),
+                "duration_seconds": duration_seconds,
                 "new_release_count": release_count,
+                "request_count": user_request_counts[user.user_UUID],
                 **user_log_context(user),
             },
         )
+        await record_user_cost(user, duration_seconds)
         return True, release_count
-    except Exception as e:
-        logger.exception(
-            "User processing failed",
+    except USER_DEFER_ERRORS as e:
+        if requeued or e.retry_after > MAX_USER_DEFER_SECONDS:
+            return await fail_user(user, user_started_at, e)
+        logger.warning(
+            "User processing deferred",
             extra={
-                "event": "user_processing_finished",
-                "status": "failed",
+                "event": "user_processing_deferred",
+                "retry_after_seconds": e.retry_after,
+                "endpoint": e.endpoint,
                 "duration_seconds": round(time.monotonic() - user_started_at, 3),
                 **user_log_context(user),
             },
         )
-        await error_message(Exception(f"Error processing user: {user.safe_str()}"))
-        return False, 0
+        raise
+    except Exception as e:
+        return await fail_user(user, user_started_at, e)
+
+async def record_user_cost(user: sql.User, duration_seconds: float | None) -> None:
+    try:
+        await async_sql.update_user_stats(user, user_artist_counts.get(user.user_UUID), user_request_counts[user.user_UUID], duration_seconds)
+    except Exception:
+        logger.exception("Failed to record user cost", extra={"event": "user_cost_record_failed", **user_log_context(user)})
+
+async def schedule_users(users: list[sql.User]) -> tuple[list[sql.User], dict[str, float]]:
+    by_id = {user.user_UUID: user for user in users}
+    costs = scheduler.estimate_user_costs(list(by_id), await async_sql.get_user_stats())
+    ordered_ids = scheduler.longest_job_first(list(by_id), costs)
+    projected_seconds = scheduler.project_makespan([costs[user_id] for user_id in ordered_ids], USER_CONCURRENCY)
+    logger.info(
+        "Users scheduled",
+        extra={
+            "event": "notifier_users_scheduled",
+            "user_count": len(ordered_ids),
+            "user_concurrency": USER_CONCURRENCY,
+            "projected_duration_seconds": round(projected_seconds, 3),
+            "deadline_seconds": NOTIFIER_DEADLINE_SECONDS or None,
+        },
+    )
+    return [by_id[user_id] for user_id in ordered_ids], costs
+
+def deadline_overshoot(queued_costs: list[float], finished_user_count: int) -> bool:
+    if not NOTIFIER_DEADLINE_SECONDS:
+        return False
+    # Users already in flight are not counted, so this is a lower bound on the finish time.
+    projected_seconds = time.monotonic() - notifier_started_at + scheduler.project_makespan(queued_costs, USER_CONCURRENCY)
+    if projected_seconds <= NOTIFIER_DEADLINE_SECONDS:
+        return False
+    logger.warning(
+        "Notifier run projected to miss its deadline",
+        extra={
+            "event": "notifier_deadline_overshoot_projected",
+            "projected_duration_seconds": round(projected_seconds, 3),
+            "deadline_seconds": NOTIFIER_DEADLINE_SECONDS,
+            "user_concurrency": USER_CONCURRENCY,
+            "finished_user_count": finished_user_count,
+            "queued_user_count": len(queued_costs),
+        },
+    )
+    return True
+
+async def fail_user(user: sql.User, user_started_at: float, error: Exception) -> tuple[bool, int]:
+    logger.error(
+        "User processing failed",
+        exc_info=(type(error), error, error.__traceback__),
+        extra={
+            "event": "user_processing_finished",
+            "status": "failed",
+            "error_type": type(error).__name__,
+            "duration_seconds": round(time.monotonic() - user_started_at, 3),
+            **user_log_context(user),
+        },
+    )
+    if user.user_UUID in user_artist_counts:
+        # Without a finished scan this is the only cost signal, scaled by the fleet's per-artist rate next run.
+        await record_user_cost(user, None)
+    if isinstance(error, UserRequestFailed) and error.status_code == 401:
+        # Drop a rejected cached token so the next run refreshes instead of reusing it.
+        try:
+            await async_sql.update_user_access_token(user, None, None)
+        except Exception:
+            logger.exception("Failed to clear cached access token", extra={"event": "spotify_access_token_clear_failed", **user_log_context(user)})
+    await error_message(Exception(f"Error processing user: {user.safe_str()}: {error}"))
+    return False, 0
+
+async def prefetch_user(user: sql.User, session: aiohttp.ClientSession) -> list[str]:
+    await ensure_access_token(user, PREFETCH_TOKEN_MIN_REMAINING_SECONDS)
+    artists = await load_followed_artists(user, recheck=True)
+    if user.playlist_id:
+        if await check_playlist_exists(user, force=True):
+            await load_known_playlist_tracks(user, session)
+        else:
+            logger.info("Configured playlist was not found", extra={"event": "playlist_missing", **user_log_context(user)})
+    return [artist['id'] for artist in artists]
+
+async def fetch_artist_baseline(user: sql.User, artist_id: str, session: aiohttp.ClientSession) -> tuple[str, dict]:
+    async with SPOTIFY_SEMAPHORE:
+        response = await spotify_request(user, ARTIST_ALBUMS_URL.format(artist_id=artist_id), session, {
+            "limit": "50",
+            "include_groups": ",".join(DAILY_CATEGORIES),
+            "market": "US"
+        })
+    items = response.get('items') or []
+    # Groups come back in include_groups order, so a page that stops before the last group can't vouch for the newest release.
+    if response.get('next') and not any(item.get('album_group') == DAILY_CATEGORIES[-1] for item in items):
+        return artist_id, {"album_total": None, "last_release_date": None}
+    return artist_id, {"album_total": response.get('total'), "last_release_date": max((item['release_date'] for item in items), default=None)}
+
+async def prefetch() -> tuple[int, int]:
+    if profiler:
+        profiler.install_task_timer(asyncio.get_running_loop())
+    users = await async_sql.iterate_users_one_by_one()
+    logger.info("Starting notifier prefetch", extra={"event": "notifier_prefetch_started", "user_count": len(users)})
+    artist_users: dict[str, sql.User] = {}
+    failed_users = 0
+    baselines = {}
+    async with aiohttp.ClientSession() as session:
+        for user in users:
+            try:
+                artist_ids = await prefetch_user(user, session)
+            except Exception:
+                logger.exception("User prefetch failed", extra={"event": "user_prefetch_failed", **user_log_context(user)})
+                failed_users += 1
+                continue
+            # Each artist is baselined once, with the token of the first user who follows it.
+            for artist_id in artist_ids:
+                artist_users.setdefault(artist_id, user)
+
+        tasks = (fetch_artist_baseline(user, artist_id, session) for artist_id, user in artist_users.items())
+        async with aclosing(iterate_completed(tasks, ARTIST_TASK_WINDOW)) as completed_tasks:
+            async for task in completed_tasks:
+                try:
+                    artist_id, baseline = task.result()
+                except Exception as result:
+                    logger.warning(
+                        "Artist baseline failed",
+                        exc_info=(type(result), result, result.__traceback__),
+                        extra={"event": "artist_baseline_failed"},
+                    )
+                    continue
+                if baseline["album_total"] is not None:
+                    baselines[artist_id] = baseline
+    if baselines:
+        await async_sql.update_artist_baselines(baselines)
+    logger.info(
+        "Finished notifier prefetch",
+        extra={
+            "event": "notifier_prefetch_finished",
+            "user_count": len(users),
+            "failed_user_count": failed_users,
+            "artist_count": len(artist_users),
+            "baseline_count": len(baselines),
+            "request_count": sum(request_counts.values()),
+            "request_counts_by_endpoint": dict(request_counts),
+            "duration_seconds": round(time.monotonic() - notifier_started_at, 3),
+        },
+    )
+    return len(users), failed_users
+
+async def watch_request_budget(started_at: datetime) -> int:
+    spent_this_hour = await async_sql.get_watch_request_count((started_at - timedelta(hours=1)).isoformat())
+    per_run = WATCH_REQUESTS_PER_HOUR * WATCH_INTERVAL_MINUTES // 60
+    return max(0, min(WATCH_REQUESTS_PER_HOUR - spent_this_hour, per_run))
+
+def watch_delivery_cost(user: sql.User, releases: ReleaseCollector) -> int:
+    if not user.playlist_id:
+        return 0
+    # Token refresh, playlist check and follow check, one track lookup per album, and the playlist write.
+    return 4 + len(releases.albums)
+
+async def deliver_watch_releases(user: sql.User, releases: ReleaseCollector, session: aiohttp.ClientSession) -> None:
+    await async_sql.update_user_items(user)
+    track_resolver = None
+    if user.playlist_id:
+        album_ids = asyncio.Queue()
+        for album_id in releases.albums:
+            album_ids.put_nowait(album_id)
+        album_ids.put_nowait(None)
+        try:
+            await ensure_access_token(user)
+            track_resolver = asyncio.create_task(resolve_album_tracks(user, session, album_ids))
+        except Exception as e:
+            logger.exception("Watch playlist token refresh failed", extra={"event": "watch_playlist_token_failed", **user_log_context(user)})
+            await error_message(Exception(f"Error refreshing token for watch delivery: {e}"))
+
+    if track_resolver:
+        await add_to_playlist(user, len(releases), track_resolver)
+    await send_message(user, render_digest([f"New release spotted! {datetime.now().strftime('%m/%d')}", ""], releases))
+
+async def watch_releases() -> tuple[int, int]:
+    started_at = datetime.now(timezone.utc)
+    budget = await watch_request_budget(started_at)
+    today = date.today()
+    release_date = today.strftime("%Y-%m-%d")
+    candidates = await async_sql.get_watch_candidates((today - timedelta(days=WATCH_HOT_DAYS)).isoformat())
+    scores = scheduler.hot_artist_scores({artist_id: candidate["stats"] for artist_id, candidate in candidates.items()}, today)
+    hot_artist_ids = sorted(scores, key=scores.get, reverse=True)
+    logger.info(
+        "Starting release watch",
+        extra={"event": "notifier_watch_started", "hot_artist_count": len(hot_artist_ids), "request_budget": budget},
+    )
+
+    users: dict[str, sql.User | None] = {}
+    updated_artist_stats = {}
+    found: dict[str, ReleaseCollector] = {}
+    polled_artist_count = 0
+    failed_artist_count = 0
+    failed_delivery_count = 0
+    deferred_delivery_count = 0
+
+    async def load_user(user_UUID: str) -> sql.User | None:
+        if user_UUID not in users:
+            users[user_UUID] = await async_sql.get_user_by_uuid(user_UUID)
+        return users[user_UUID]
+
+    async def token_user(user_UUIDs: list[str]) -> sql.User:
+        for user_UUID in user_UUIDs:
+            user = await load_user(user_UUID)
+            if not user:
+                continue
+            try:
+                await ensure_access_token(user)
+                return user
+            except Exception:
+                continue
+        raise UserRequestFailed("No follower has a usable Spotify token", endpoint_name(ARTIST_ALBUMS_URL))
+
+    async def poll_artist(artist_id: str, session: aiohttp.ClientSession) -> tuple[str, list[Release]]:
+        candidate = candidates[artist_id]
+        user = await token_user(candidate["user_UUIDs"])
+        albums, updated_artist_stats[artist_id] = await recent_albums_for_artist(
+            user, artist_id, session, SPOTIFY_SEMAPHORE, release_date, candidate["stats"]
+        )
+        return artist_id, [album for album in albums if album.release_date == release_date]
+
+    def poll_cost(artist_id: str) -> int:
+        candidate = candidates[artist_id]
+        # A usable baseline is usually settled by one probe; otherwise the combined call plus one group page.
+        cost = 1 if baseline_is_usable(candidate["stats"], release_date) else 2
+        # The first poll for a follower may also refresh their token.
+        return cost + (0 if candidate["user_UUIDs"][0] in users else 1)
+
+    # A quarter of the budget is held back for token refreshes and playlist writes during delivery.
+    poll_budget = budget * 3 // 4
+    queued = deque(hot_artist_ids)
+    reserved: dict[asyncio.Future, int] = {}
+
+    async with aiohttp.ClientSession() as session:
+        try:
+            while queued or reserved:
+                # Each poll reserves its cost before it starts, so requests still in flight count against the budget.
+                while (
+                    queued
+                    and len(reserved) < ARTIST_TASK_WINDOW
+                    and sum(request_counts.values()) + sum(reserved.values()) + poll_cost(queued[0]) <= poll_budget
+                ):
+                    artist_id = queued.popleft()
+                    reserved[asyncio.ensure_future(poll_artist(artist_id, session))] = poll_cost(artist_id)
+                    polled_artist_count += 1
+                if not reserved:
+                    break
+                done, _ = await asyncio.wait(reserved, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    del reserved[task]
+                    try:
+                        artist_id, albums = task.result()
+                    except Exception as result:
+                        failed_artist_count += 1
+                        logger.warning(
+                            "Watch poll failed",
+                            exc_info=(type(result), result, result.__traceback__),
+                            extra={"event": "watch_artist_poll_failed"},
+                        )
+                        continue
+                    for user_UUID in candidates[artist_id]["user_UUIDs"]:
+                        user = await load_user(user_UUID)
+                        for album in albums:
+                            if user and not user.has_item(album.id):
+                                user.add_item(album.id)
+                                found.setdefault(user_UUID, ReleaseCollector()).add(candidates[artist_id]["name"], album)
+        finally:
+            for task in reserved:
+                task.cancel()
+
+        if updated_artist_stats:
+            await async_sql.update_artist_stats(updated_artist_stats)
+        for user_UUID, releases in found.items():
+            if sum(request_counts.values()) + watch_delivery_cost(users[user_UUID], releases) > budget:
+                # Nothing is saved for this user, so the daily run still finds and delivers these releases.
+                deferred_delivery_count += 1
+                logger.warning(
+                    "Watch delivery deferred by request budget",
+                    extra={"event": "watch_delivery_deferred", "release_count": len(releases), **user_log_context(users[user_UUID])},
+                )
+                continue
+            try:
+                await deliver_watch_releases(users[user_UUID], releases, session)
+            except Exception as e:
+                failed_delivery_count += 1
+                logger.exception("Watch delivery failed", extra={"event": "watch_delivery_failed", **user_log_context(users[user_UUID])})
+                await error_message(Exception(f"Error delivering watched releases: {e}"))
+
+    request_count = sum(request_counts.values())
+    release_count = sum(len(releases) for releases in found.values())
+    await async_sql.record_watch_run(started_at.isoformat(), request_count, polled_artist_count, release_count)
+    logger.info(
+        "Finished release watch",
+        extra={
+            "event": "notifier_watch_finished",
+            "hot_artist_count": len(hot_artist_ids),
+            "polled_artist_count": polled_artist_count,
+            "failed_artist_count": failed_artist_count,
+            "delivered_user_count": len(found) - deferred_delivery_count,
+            "failed_delivery_count": failed_delivery_count,
+            "deferred_delivery_count": deferred_delivery_count,
+            "new_release_count": release_count,
+            "request_budget": budget,
+            "request_count": request_count,
+            "duration_seconds": round(time.monotonic() - notifier_started_at, 3),
+        },
+    )
+    return len(found) - deferred_delivery_count, failed_delivery_count
 
 @bot.event
-async def send_message(user: sql.User, message: str):
-    # Split message if it's too long
-    messages = split_long_message(message)
+async def send_message(user: sql.User, message: str | list[str] | list[render.RenderedMessage]):
+    # Rendered digests arrive pre-chunked; plain text is split if it's too long
+    messages = message if isinstance(message, list) else split_long_message(message)
+    messages = [msg if isinstance(msg, render.RenderedMessage) else render.RenderedMessage(msg) for msg in messages]
     logger.info(
         "Discord message send started",
         extra={"event": "discord_message_send_started", "message_part_count": len(messages), **user_log_context(user)},
     )
     
-    if user.discord_id:
-        try:
-            discord_user = await bot.fetch_user(user.discord_id)
-            for msg in messages:
-                await discord_user.send(msg)
-            logger.info(
-                "Discord message sent by user ID",
-                extra={"event": "discord_message_send_succeeded", "delivery_method": "discord_id", "message_part_count": len(messages), **user_log_context(user)},
-            )
-        except discord.NotFound:
-            logger.warning("Discord user ID not found", extra={"event": "discord_message_send_failed", "reason": "user_not_found", **user_log_context(user)})
-        except discord.Forbidden:
-            logger.warning("Discord user DMs are closed", extra={"event": "discord_message_send_failed", "reason": "dms_closed", **user_log_context(user)})
-        except Exception as e:
-            logger.exception("Discord message send failed", extra={"event": "discord_message_send_failed", "reason": "unexpected_error", **user_log_context(user)})
+    sent: list[tuple[str, str]] = []
+    try:
+        if user.discord_id and discord_rest_client:
+            try:
+                await send_rest_messages(user, messages, sent)
+                logger.info(
+                    "Discord message sent over REST",
+                    extra={"event": "discord_message_send_succeeded", "delivery_method": "rest", "message_part_count": len(messages), **user_log_context(user)},
+                )
+            except DiscordRestError as e:
+                reason = {403: "dms_closed", 404: "user_not_found"}.get(e.status, "unexpected_error")
+                logger.warning("Discord REST message send failed", extra={"event": "discord_message_send_failed", "reason": reason, "status_code": e.status, **user_log_context(user)})
+            except Exception:
+                logger.exception("Discord message send failed", extra={"event": "discord_message_send_failed", "reason": "unexpected_error", **user_log_context(user)})
+        elif user.discord_id:
+            try:
+                discord_user = await bot.fetch_user(user.discord_id)
+                for msg in messages:
+                    sent.append(await send_rendered(discord_user, msg))
+                logger.info(
+                    "Discord message sent by user ID",
+                    extra={"event": "discord_message_send_succeeded", "delivery_method": "discord_id", "message_part_count": len(messages), **user_log_context(user)},
+                )
+            except discord.NotFound:
+                logger.warning("Discord user ID not found", extra={"event": "discord_message_send_failed", "reason": "user_not_found", **user_log_context(user)})
+            except discord.Forbidden:
+                logger.warning("Discord user DMs are closed", extra={"event": "discord_message_send_failed", "reason": "dms_closed", **user_log_context(user)})
+            except Exception as e:
+                logger.exception("Discord message send failed", extra={"event": "discord_message_send_failed", "reason": "unexpected_error", **user_log_context(user)})
+        else:
+            for client in bot.guilds:
+                for member in client.members:
+                    if member.name == user.discord_username:
+                        try:
+                            await async_sql.update_user_discord_id(user, str(member.id))
+                        except Exception as e:
+                            logger.exception("Failed to cache Discord ID", extra={"event": "discord_id_cache_failed", **user_log_context(user)})
+                            await error_message(Exception(f"Error updating user discord ID: {e}"))
+                        for msg in messages:
+                            sent.append(await send_rendered(member, msg))
+                        logger.info(
+                            "Discord message sent by username lookup",
+                            extra={
+                                "event": "discord_message_send_succeeded",
+                                "delivery_method": "guild_member_lookup",
+                                "message_part_count": len(messages),
+                                **user_log_context(user),
+                            },
+                        )
+                        return
+            logger.warning("Discord member was not found", extra={"event": "discord_message_send_failed", "reason": "member_not_found", **user_log_context(user)})
+    finally:
+        # Every delivered message is tracked so retention cleanup can delete it by ID later.
+        if sent:
+            try:
+                await async_sql.record_sent_messages(user, sent)
+            except Exception:
+                logger.exception("Failed to record sent messages", extra={"event": "discord_sent_messages_record_failed", **user_log_context(user)})
+
+async def send_rest_messages(user: sql.User, messages: list[render.RenderedMessage], sent: list[tuple[str, str]]) -> None:
+    for msg in messages:
+        for reopened in (False, True):
+            if not user.dm_channel_id:
+                await async_sql.update_user_dm_channel_id(user, await discord_rest_client.open_dm_channel(user.discord_id))
+            try:
+                response = await discord_rest_client.create_message(user.dm_channel_id, msg.content, msg.embeds)
+                sent.append((user.dm_channel_id, response["id"]))
+                break
+            except DiscordRestError as e:
+                # A stale cached DM channel is reopened once; anything else goes to the caller.
+                if e.code != UNKNOWN_CHANNEL or reopened:
+                    raise
+                await async_sql.update_user_dm_channel_id(user, None)
+
+async def send_rendered(target: discord.abc.Messageable, message: render.RenderedMessage) -> tuple[str, str]:
+    if message.embeds:
+        sent = await target.send(content=message.content, embeds=[discord.Embed.from_dict(embed) for embed in message.embeds])
     else:
-        for client in bot.guilds:
-            for member in client.members:
-                if member.name == user.discord_username:
-                    try:
-                        sql.update_user_discord_id(user, str(member.id))
-                    except Exception as e:
-                        logger.exception("Failed to cache Discord ID", extra={"event": "discord_id_cache_failed", **user_log_context(user)})
-                        await error_message(Exception(f"Error updating user discord ID: {e}"))
-                    for msg in messages:
-                        await member.send(msg)
-                    logger.info(
-                        "Discord message sent by username lookup",
-                        extra={
-                            "event": "discord_message_send_succeeded",
-                            "delivery_method": "guild_member_lookup",
-                            "message_part_count": len(messages),
-                            **user_log_context(user),
-                        },
-                    )
-                    return
-        logger.warning("Discord member was not found", extra={"event": "discord_message_send_failed", "reason": "member_not_found", **user_log_context(user)})
+        sent = await target.send(message.content)
+    return str(sent.channel.id), str(sent.id)
 
-def split_long_message(message: str, max_length: int = 1900) -> list[str]:
+def split_long_message(message: str, max_length: int = render.DISCORD_CHUNK_LENGTH) -> list[str]:
     """Split a message that's too long by looking for \n delimiters"""
-    if len(message) <= max_length:
-        return [message]
-    
-    messages = []
-    current_message = ""
-    
-    # Split by lines
-    lines = message.split('\n')
-    
-    for line in lines:
-        # Check if adding this line would exceed the limit
-        if len(current_message + line + '\n') > max_length:
-            if current_message:
-                messages.append(current_message.rstrip())
-                current_message = line + '\n'
-            else:
-                # If a single line is too long, we have to truncate it
-                messages.append(line[:max_length-3] + "...")
-                current_message = ""
-        else:
-            current_message += line + '\n'
-    
-    # Add the last message if it has content
-    if current_message.strip():
-        messages.append(current_message.rstrip())
-    
-    return messages
+    return render.split_text(message, max_length)
 
 @bot.event
 async def error_message(error: Exception):
     logger.error("Sending owner error notification", extra={"event": "owner_error_notification_started", "error_type": type(error).__name__, "error_message": str(error)})
     if OWNER_DISCORD_USERNAME:
         try:
-            owner_user = sql.get_user_by_discord_username(OWNER_DISCORD_USERNAME)
+            owner_user = await async_sql.get_user_by_discord_username(OWNER_DISCORD_USERNAME)
             if not owner_user:
                 logger.warning(
                     "Owner user was not found for error notification",
@@ -637,24 +1263,48 @@ async def error_message(error: Exception):
     else:
         logger.warning("Owner error notification skipped", extra={"event": "owner_error_notification_skipped", "reason": "owner_discord_username_missing"})
 
-@bot.event
-async def delete_messages():
-    for client in bot.guilds:
-        for member in client.members:
-            if member.name == OWNER_DISCORD_USERNAME:
-                OWNER_DISCORD_ID = member.id
-                break
+async def delete_messages() -> None:
+    if profiler:
+        profiler.install_task_timer(asyncio.get_running_loop())
+    expired = await async_sql.get_expired_messages(MESSAGE_RETENTION_DAYS)
+    logger.info("Starting message cleanup", extra={"event": "discord_delete_messages_started", "message_count": len(expired)})
+    semaphore = asyncio.Semaphore(MESSAGE_DELETE_CONCURRENCY)
+    deleted: list[tuple[str, str]] = []
+    failed_count = 0
 
-    try:
-        user = await bot.fetch_user(OWNER_DISCORD_ID)
-        channel = await user.create_dm()
+    async def delete_one(client: DiscordRestClient, channel_id: str, message_id: str) -> None:
+        nonlocal failed_count
+        async with semaphore:
+            try:
+                await client.delete_message(channel_id, message_id)
+            except DiscordRestError as e:
+                # Messages or channels that are already gone need no further attempts.
+                if e.code not in (UNKNOWN_MESSAGE, UNKNOWN_CHANNEL):
+                    failed_count += 1
+                    logger.warning(
+                        "Discord message delete failed",
+                        extra={"event": "discord_delete_message_failed", "status_code": e.status, "channel_id": channel_id, "message_id": message_id},
+                    )
+                    return
+            except Exception:
+                # Network errors only cost this message; it stays tracked and is retried on the next cleanup.
+                failed_count += 1
+                logger.warning(
+                    "Discord message delete failed",
+                    exc_info=True,
+                    extra={"event": "discord_delete_message_failed", "channel_id": channel_id, "message_id": message_id},
+                )
+                return
+        deleted.append((channel_id, message_id))
 
-        async for message in channel.history(limit=100):
-            if message.author == bot.user:
-                await message.delete()
-    except Exception as e:
-        logger.exception("Error deleting Discord messages", extra={"event": "discord_delete_messages_failed"})
-        await bot.close()
+    async with DiscordRestClient(DISCORD_TOKEN) as client:
+        await asyncio.gather(*(delete_one(client, channel_id, message_id) for channel_id, message_id in expired))
+    if deleted:
+        await async_sql.delete_sent_messages(deleted)
+    logger.info(
+        "Finished message cleanup",
+        extra={"event": "discord_delete_messages_finished", "deleted_count": len(deleted), "failed_count": failed_count},
+    )
 
 @bot.event
 async def on_ready():
@@ -666,7 +1316,57 @@ async def on_ready():
             "guild_count": len(bot.guilds),
         },
     )
-    users = list(sql.iterate_users_one_by_one())
+    await run_notifier()
+    await bot.close()
+
+async def run_notifier() -> None:
+    global discord_rest_client
+    if profiler:
+        profiler.install_task_timer(asyncio.get_running_loop())
+    async with DiscordRestClient(DISCORD_TOKEN) as rest_client:
+        discord_rest_client = rest_client if DISCORD_DELIVERY == "rest" else None
+        mode = "watch" if watch else "catchup" if catchup else "daily"
+        with tracing.span("notifier_run", mode=mode):
+            await run_recorded(mode, watch_releases if watch else notify_users)
+        logger.info("Discord REST usage", extra={"event": "discord_rest_usage", "request_count": rest_client.request_count})
+    discord_rest_client = None
+
+async def run_recorded(mode: str, run: Callable[[], Awaitable[tuple[int, int]]]) -> None:
+    started_at = datetime.now(timezone.utc)
+    status = "failed"
+    user_count = failed_user_count = 0
+    try:
+        user_count, failed_user_count = await run()
+        status = "partial" if failed_user_count else "succeeded"
+    finally:
+        await record_run(mode, status, started_at, user_count, failed_user_count)
+
+async def record_run(mode: str, status: str, started_at: datetime, user_count: int, failed_user_count: int) -> None:
+    finished_at = datetime.now(timezone.utc)
+    cache_hit_rates = {
+        name: round(cache_hits[name] / (cache_hits[name] + cache_misses[name]), 4)
+        for name in sorted(cache_hits.keys() | cache_misses.keys())
+    }
+    run = {
+        "run_id": RUN_ID,
+        "mode": mode,
+        "status": status,
+        "started_at": started_at.isoformat(),
+        "finished_at": finished_at.isoformat(),
+        "duration_seconds": round((finished_at - started_at).total_seconds(), 3),
+        "user_count": user_count,
+        "failed_user_count": failed_user_count,
+        "request_count": sum(request_counts.values()),
+        "rate_limited_count": sum(rate_limited_counts.values()),
+        "cache_hit_rates": cache_hit_rates,
+    }
+    try:
+        await async_sql.record_run(run, {name: tuple(totals) for name, totals in tracing.span_totals.items()})
+    except Exception:
+        logger.exception("Failed to record notifier run", extra={"event": "notifier_run_record_failed", "mode": mode, "status": status})
+
+async def notify_users() -> tuple[int, int]:
+    users = await async_sql.iterate_users_one_by_one()
     logger.info(
         "Starting notifier user loop",
         extra={
@@ -680,8 +1380,39 @@ async def on_ready():
     successful_users = 0
     failed_users = 0
     total_new_releases = 0
-    for user in users:
-        succeeded, release_count = await process_user(user)
+    deferred_users = []
+    ordered_users, costs = await schedule_users(users)
+    queue = deque(ordered_users)
+    deadline_missed = deadline_overshoot([costs[user.user_UUID] for user in queue], 0)
+
+    async def user_worker():
+        nonlocal successful_users, failed_users, total_new_releases, deadline_missed
+        while queue:
+            user = queue.popleft()
+            try:
+                with tracing.span("user", user_uuid=user.user_UUID):
+                    succeeded, release_count = await process_user(user)
+            except USER_DEFER_ERRORS as e:
+                deferred_users.append((time.monotonic() + e.retry_after, user))
+                continue
+            if succeeded:
+                successful_users += 1
+            else:
+                failed_users += 1
+            total_new_releases += release_count
+            # Estimates can be off, so the projection is refreshed as users finish; it warns once per run.
+            if not deadline_missed:
+                deadline_missed = deadline_overshoot([costs[user.user_UUID] for user in queue], successful_users + failed_users)
+
+    await asyncio.gather(*(user_worker() for _ in range(max(1, USER_CONCURRENCY))))
+
+    # Throttled users get one more attempt once their Retry-After or the circuit cooldown has passed, after everyone else.
+    for ready_at, user in sorted(deferred_users, key=lambda deferred: deferred[0]):
+        await asyncio.sleep(max(0, ready_at - time.monotonic()))
+        # Reload so items half-added by the throttled attempt don't hide today's releases.
+        user = await async_sql.get_user_by_uuid(user.user_UUID) or user
+        with tracing.span("user", user_uuid=user.user_UUID, requeued=True):
+            succeeded, release_count = await process_user(user, requeued=True)
         if succeeded:
             successful_users += 1
         else:
@@ -695,24 +1426,33 @@ async def on_ready():
             "user_count": len(users),
             "successful_user_count": successful_users,
             "failed_user_count": failed_users,
+            "deferred_user_count": len(deferred_users),
             "new_release_count": total_new_releases,
+            "request_count": sum(request_counts.values()),
+            "request_counts_by_endpoint": dict(request_counts),
+            "response_bytes": sum(response_bytes.values()),
+            "response_bytes_by_endpoint": dict(response_bytes),
+            "json_decode_seconds": round(sum(decode_seconds.values()), 3),
             "duration_seconds": round(time.monotonic() - notifier_started_at, 3),
         },
     )
-    await bot.close()
+    return len(users), failed_users
 
 if __name__ == "__main__":
     mode = "daily"
-    if len(sys.argv) > 1:
-        mode = sys.argv[1]
+    args = [arg for arg in sys.argv[1:] if arg != "--profile"]
+    if len(args) < len(sys.argv) - 1:
+        profiler = NotifierProfiler(os.getenv("PROFILE_OUTPUT_DIR", "profiles"), RUN_ID)
+    if len(args) > 0:
+        mode = args[0]
             
         if mode == "catchup":
             catchup = True
             
-            if len(sys.argv) == 4:
+            if len(args) == 3:
                 try:
-                    start_day = datetime.strptime(sys.argv[2], "%m-%d-%Y")
-                    end_day = datetime.strptime(sys.argv[3], "%m-%d-%Y")
+                    start_day = datetime.strptime(args[1], "%m-%d-%Y")
+                    end_day = datetime.strptime(args[2], "%m-%d-%Y")
                     if end_day == datetime.now().date():
                         end_day = end_day - timedelta(days=1)
                 except ValueError:
@@ -724,10 +1464,35 @@ if __name__ == "__main__":
                     day = start_day + timedelta(days=i)
                     catchup_days.append(day)
                 catchup_days.append(end_day)
+                catchup_dates = frozenset(day.strftime("%Y-%m-%d") for day in catchup_days)
             else:
                 logger.error("Invalid catchup arguments", extra={"event": "notifier_cli_invalid_arguments"})
                 sys.exit(1)
-        else:
+        elif mode == "watch":
+            watch = True
+        elif mode == "cleanup":
+            if not DISCORD_TOKEN:
+                logger.error("Discord token is not set", extra={"event": "notifier_missing_discord_token"})
+                sys.exit(1)
+            if profiler:
+                profiler.start()
+            try:
+                asyncio.run(delete_messages())
+            finally:
+                if profiler:
+                    profiler.stop()
+            sys.exit(0)
+        elif mode == "prefetch":
+            if profiler:
+                profiler.start()
+            try:
+                with tracing.span("notifier_run", mode=mode):
+                    asyncio.run(run_recorded(mode, prefetch))
+            finally:
+                if profiler:
+                    profiler.stop()
+            sys.exit(0)
+        elif mode != "daily":
             logger.error("Invalid notifier mode", extra={"event": "notifier_cli_invalid_mode", "mode": mode})
             sys.exit(1)
 
@@ -735,7 +1500,8 @@ if __name__ == "__main__":
         "Notifier starting",
         extra={
             "event": "notifier_started",
-            "mode": "catchup" if catchup else "daily",
+            "mode": mode,
+            "profile": profiler is not None,
             "is_new_day": is_new_day,
             "catchup_start_date": catchup_days[0].strftime("%Y-%m-%d") if catchup_days else None,
             "catchup_end_date": catchup_days[-1].strftime("%Y-%m-%d") if catchup_days else None,
@@ -743,7 +1509,19 @@ if __name__ == "__main__":
     )
 
     if DISCORD_TOKEN:
-        bot.run(DISCORD_TOKEN)
+        # The gateway is only needed to resolve Discord usernames that have no cached ID yet.
+        use_gateway = DISCORD_DELIVERY != "rest" or sql.count_users_without_discord_id() > 0
+        logger.info("Discord delivery selected", extra={"event": "notifier_discord_delivery", "delivery": "gateway" if use_gateway else "rest"})
+        if profiler:
+            profiler.start()
+        try:
+            if use_gateway:
+                bot.run(DISCORD_TOKEN)
+            else:
+                asyncio.run(run_notifier())
+        finally:
+            if profiler:
+                profiler.stop()
     else:
         logger.error("Discord token is not set", extra={"event": "notifier_missing_discord_token"})
         sys.exit(1)
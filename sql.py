@@ -1,7 +1,11 @@
 import json
 import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
-from sqlite3 import connect
+from sqlite3 import IntegrityError, Row, connect
 from typing import Generator
 
 from logging_config import configure_logging, get_logger
@@ -10,9 +14,49 @@ configure_logging()
 logger = get_logger(__name__)
 
 USERS_DB = Path(__file__).resolve().parent / "users.db"
+SQL_BATCH_SIZE = 500
+USER_IMPORT_BATCH_SIZE = 10000
+USER_BASE_COLUMNS = ["user_UUID", "username", "discord_username", "refresh_token", "playlist_id", "discord_id", "user_items"]
+USER_MIGRATION_COLUMNS = {
+    "playlist_snapshot_id": "TEXT",
+    "playlist_validated_at": "TEXT",
+    "access_token": "TEXT",
+    "access_token_expires_at": "REAL",
+    "artists_synced_at": "TEXT",
+    "artists_checked_at": "TEXT",
+    "dm_channel_id": "TEXT",
+    "message_retention_days": "INTEGER",
+}
+ARTIST_STATS_MIGRATION_COLUMNS = {
+    "total_checked_at": "TEXT",
+}
+
+
+def connect_db():
+    conn = connect(USERS_DB)
+    conn.row_factory = Row
+    return conn
 
 
 class User:
+    __slots__ = (
+        "user_UUID",
+        "username",
+        "discord_username",
+        "refresh_token",
+        "playlist_id",
+        "discord_id",
+        "access_token",
+        "access_token_expires_at",
+        "artists_synced_at",
+        "artists_checked_at",
+        "dm_channel_id",
+        "playlist_snapshot_id",
+        "playlist_validated_at",
+        "_user_items",
+        "_user_items_json",
+    )
+
     def __init__(self, user_UUID, username, discord_username, refresh_token, playlist_id=None, discord_id=None, user_items=None, access_token=None):
         self.user_UUID = user_UUID
         self.username = username
@@ -21,15 +65,56 @@ class User:
         self.playlist_id = playlist_id
         self.discord_id = discord_id
         self.access_token = access_token
+        self.access_token_expires_at = None
+        self.artists_synced_at = None
+        self.artists_checked_at = None
+        self.dm_channel_id = None
+        self.playlist_snapshot_id = None
+        self.playlist_validated_at = None
+        # Items are stored as a JSON string and only decoded when something actually reads them.
+        self._user_items = None
+        self._user_items_json = None
         if user_items is None:
-            self.user_items = set()
+            self._user_items = set()
         elif isinstance(user_items, str):
+            self._user_items_json = user_items
+        else:
+            self._user_items = set(user_items)
+
+    @classmethod
+    def from_row(cls, row: Row) -> "User":
+        user = cls(
+            row["user_UUID"],
+            row["username"],
+            row["discord_username"],
+            row["refresh_token"],
+            row["playlist_id"],
+            row["discord_id"],
+            row["user_items"],
+        )
+        user.access_token = row["access_token"]
+        user.access_token_expires_at = row["access_token_expires_at"]
+        user.artists_synced_at = row["artists_synced_at"]
+        user.artists_checked_at = row["artists_checked_at"]
+        user.dm_channel_id = row["dm_channel_id"]
+        user.playlist_snapshot_id = row["playlist_snapshot_id"]
+        user.playlist_validated_at = row["playlist_validated_at"]
+        return user
+
+    @property
+    def user_items(self) -> set:
+        if self._user_items is None:
             try:
-                self.user_items = set(json.loads(user_items))
+                self._user_items = set(json.loads(self._user_items_json))
             except (json.JSONDecodeError, TypeError):
-                self.user_items = set()
-        else:
-            self.user_items = set(user_items)
+                self._user_items = set()
+            self._user_items_json = None
+        return self._user_items
+
+    @user_items.setter
+    def user_items(self, items) -> None:
+        self._user_items = set(items)
+        self._user_items_json = None
 
     def __str__(self):
         return self.safe_str()
@@ -62,23 +147,63 @@ class User:
         self.user_items = set()
 
     def get_items_json(self):
-        return json.dumps(list(self.user_items))
+        if self._user_items is None:
+            return self._user_items_json
+        return json.dumps(list(self._user_items))
 
 
 def init_db() -> None:
     try:
-        with connect(USERS_DB) as conn:
+        with connect_db() as conn:
             cursor = conn.cursor()
             cursor.execute("CREATE TABLE IF NOT EXISTS users (user_UUID TEXT, username TEXT, discord_username TEXT, refresh_token TEXT, playlist_id TEXT, discord_id TEXT, user_items TEXT)")
+            add_missing_user_columns(cursor)
+            add_username_index(cursor)
+            cursor.execute("CREATE TABLE IF NOT EXISTS artist_stats (artist_id TEXT PRIMARY KEY, album_total INTEGER, fetch_depth INTEGER, last_release_date TEXT, updated_at TEXT)")
+            add_missing_columns(cursor, "artist_stats", ARTIST_STATS_MIGRATION_COLUMNS)
+            cursor.execute("CREATE TABLE IF NOT EXISTS user_stats (user_UUID TEXT PRIMARY KEY, artist_count INTEGER, request_count INTEGER, duration_seconds REAL, updated_at TEXT)")
+            cursor.execute("CREATE TABLE IF NOT EXISTS playlist_sync (playlist_id TEXT PRIMARY KEY, snapshot_id TEXT, synced_at TEXT)")
+            cursor.execute("CREATE TABLE IF NOT EXISTS playlist_tracks (playlist_id TEXT, track_uri TEXT, PRIMARY KEY (playlist_id, track_uri))")
+            cursor.execute("CREATE TABLE IF NOT EXISTS sent_messages (channel_id TEXT, message_id TEXT, user_UUID TEXT, sent_at REAL, PRIMARY KEY (channel_id, message_id))")
+            cursor.execute("CREATE INDEX IF NOT EXISTS sent_messages_sent_at ON sent_messages (sent_at)")
+            cursor.execute("CREATE TABLE IF NOT EXISTS watch_runs (started_at TEXT, request_count INTEGER, artist_count INTEGER, release_count INTEGER)")
+            cursor.execute(
+                "CREATE TABLE IF NOT EXISTS runs (run_id TEXT PRIMARY KEY, mode TEXT, status TEXT, started_at TEXT, finished_at TEXT, duration_seconds REAL, "
+                "user_count INTEGER, failed_user_count INTEGER, request_count INTEGER, rate_limited_count INTEGER, cache_hit_rates TEXT)"
+            )
+            cursor.execute("CREATE INDEX IF NOT EXISTS runs_mode_started_at ON runs (mode, started_at)")
+            cursor.execute("CREATE TABLE IF NOT EXISTS run_stages (run_id TEXT, stage TEXT, span_count INTEGER, duration_seconds REAL, PRIMARY KEY (run_id, stage))")
+            cursor.execute("CREATE TABLE IF NOT EXISTS followed_artists (user_UUID TEXT, position INTEGER, artist_id TEXT, artist_name TEXT, PRIMARY KEY (user_UUID, position))")
         logger.info("Database initialized", extra={"event": "db_initialized", "db_path": str(USERS_DB)})
     except Exception:
         logger.exception("Error initializing database", extra={"event": "db_init_failed", "db_path": str(USERS_DB)})
         raise
 
 
+def add_missing_user_columns(cursor) -> None:
+    add_missing_columns(cursor, "users", USER_MIGRATION_COLUMNS)
+
+
+def add_username_index(cursor) -> None:
+    try:
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS users_username ON users (username)")
+    except IntegrityError:
+        # Imports need the index for conflict handling; older databases may hold duplicates that must be cleaned up by hand.
+        logger.warning("Duplicate usernames prevent the username index", extra={"event": "db_username_index_failed"})
+
+
+def add_missing_columns(cursor, table: str, migration_columns: dict[str, str]) -> None:
+    cursor.execute(f"PRAGMA table_info({table})")
+    columns = {column[1] for column in cursor.fetchall()}
+    for column, column_type in migration_columns.items():
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+            logger.info("Added table column", extra={"event": "db_column_added", "table": table, "column": column})
+
+
 def add_user(user: User) -> bool:
     try:
-        with connect(USERS_DB) as conn:
+        with connect_db() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM users WHERE username = ?", (user.username,))
             if cursor.fetchone():
@@ -97,11 +222,11 @@ def add_user(user: User) -> bool:
 
 def get_all_users() -> list[User]:
     try:
-        with connect(USERS_DB) as conn:
+        with connect_db() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM users")
             users = cursor.fetchall()
-        return [User(user[0], user[1], user[2], user[3], user[4], user[5], user[6]) for user in users]
+        return [User.from_row(user) for user in users]
     except Exception:
         logger.exception("Error getting all users", extra={"event": "db_get_all_users_failed"})
         raise
@@ -109,13 +234,13 @@ def get_all_users() -> list[User]:
 
 def iterate_users_one_by_one() -> Generator[User, None, None]:
     try:
-        with connect(USERS_DB) as conn:
+        with connect_db() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM users")
             users = cursor.fetchall()
         logger.info("Users loaded for iteration", extra={"event": "db_users_loaded", "user_count": len(users)})
         for user in users:
-            yield User(user[0], user[1], user[2], user[3], user[4], user[5], user[6])
+            yield User.from_row(user)
     except Exception:
         logger.exception("Error iterating users", extra={"event": "db_iterate_users_failed"})
         raise
@@ -123,12 +248,12 @@ def iterate_users_one_by_one() -> Generator[User, None, None]:
 
 def get_user_by_uuid(user_UUID: str) -> User | None:
     try:
-        with connect(USERS_DB) as conn:
+        with connect_db() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM users WHERE user_UUID = ?", (user_UUID,))
             user = cursor.fetchone()
         if user:
-            return User(user[0], user[1], user[2], user[3], user[4], user[5], user[6])
+            return User.from_row(user)
         return None
     except Exception:
         logger.exception("Error getting user by UUID", extra={"event": "db_get_user_by_uuid_failed", "user_uuid": user_UUID})
@@ -137,10 +262,11 @@ def get_user_by_uuid(user_UUID: str) -> User | None:
 
 def delete_user_by_uuid(user_UUID: str) -> bool:
     try:
-        with connect(USERS_DB) as conn:
+        with connect_db() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM users WHERE user_UUID = ?", (user_UUID,))
             deleted_count = cursor.rowcount
+            cursor.execute("DELETE FROM followed_artists WHERE user_UUID = ?", (user_UUID,))
         logger.info("User deleted", extra={"event": "db_user_deleted", "user_uuid": user_UUID, "deleted_count": deleted_count})
         return True
     except Exception:
@@ -150,7 +276,7 @@ def delete_user_by_uuid(user_UUID: str) -> bool:
 
 def update_user_refresh_token(user: User, refresh_token: str) -> None:
     try:
-        with connect(USERS_DB) as conn:
+        with connect_db() as conn:
             cursor = conn.cursor()
             cursor.execute("UPDATE users SET refresh_token = ? WHERE user_UUID = ?", (refresh_token, user.user_UUID))
             updated_count = cursor.rowcount
@@ -160,33 +286,159 @@ def update_user_refresh_token(user: User, refresh_token: str) -> None:
         raise
 
 
+def update_user_access_token(user: User, access_token: str | None, expires_at: float | None) -> None:
+    try:
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE users SET access_token = ?, access_token_expires_at = ? WHERE user_UUID = ?",
+                (access_token, expires_at, user.user_UUID),
+            )
+            updated_count = cursor.rowcount
+        user.access_token = access_token
+        user.access_token_expires_at = expires_at
+        logger.info("User access token updated", extra={"event": "db_access_token_updated", "updated_count": updated_count, **user.log_context()})
+    except Exception:
+        logger.exception("Error updating user access token", extra={"event": "db_access_token_update_failed", **user.log_context()})
+        raise
+
+
 def update_user_discord_id(user: User, discord_id: str) -> None:
     try:
-        with connect(USERS_DB) as conn:
+        with connect_db() as conn:
             cursor = conn.cursor()
-            cursor.execute("UPDATE users SET discord_id = ? WHERE user_UUID = ?", (discord_id, user.user_UUID))
+            cursor.execute("UPDATE users SET discord_id = ?, dm_channel_id = NULL WHERE user_UUID = ?", (discord_id, user.user_UUID))
             updated_count = cursor.rowcount
+        user.discord_id = discord_id
+        user.dm_channel_id = None
         logger.info("User Discord ID updated", extra={"event": "db_discord_id_updated", "updated_count": updated_count, **user.log_context()})
     except Exception:
         logger.exception("Error updating user Discord ID", extra={"event": "db_discord_id_update_failed", **user.log_context()})
         raise
 
 
+def update_user_dm_channel_id(user: User, dm_channel_id: str | None) -> None:
+    try:
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE users SET dm_channel_id = ? WHERE user_UUID = ?", (dm_channel_id, user.user_UUID))
+            updated_count = cursor.rowcount
+        user.dm_channel_id = dm_channel_id
+        logger.info("User DM channel updated", extra={"event": "db_dm_channel_id_updated", "updated_count": updated_count, **user.log_context()})
+    except Exception:
+        logger.exception("Error updating user DM channel", extra={"event": "db_dm_channel_id_update_failed", **user.log_context()})
+        raise
+
+
+def count_users_without_discord_id() -> int:
+    try:
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM users WHERE discord_id IS NULL OR discord_id = ''")
+            return cursor.fetchone()[0]
+    except Exception:
+        logger.exception("Error counting users without Discord ID", extra={"event": "db_count_users_without_discord_id_failed"})
+        raise
+
+
+def record_sent_messages(user: User, message_ids: list[tuple[str, str]]) -> None:
+    try:
+        sent_at = time.time()
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                "INSERT OR IGNORE INTO sent_messages (channel_id, message_id, user_UUID, sent_at) VALUES (?, ?, ?, ?)",
+                ((channel_id, message_id, user.user_UUID, sent_at) for channel_id, message_id in message_ids),
+            )
+    except Exception:
+        logger.exception("Error recording sent messages", extra={"event": "db_sent_messages_record_failed", **user.log_context()})
+        raise
+
+
+def get_expired_messages(default_retention_days: int) -> list[tuple[str, str]]:
+    try:
+        now = time.time()
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            # A user's own retention wins; 0 keeps their messages forever.
+            cursor.execute(
+                "SELECT m.channel_id, m.message_id FROM sent_messages m LEFT JOIN users u ON u.user_UUID = m.user_UUID "
+                "WHERE COALESCE(u.message_retention_days, ?) > 0 AND m.sent_at < ? - COALESCE(u.message_retention_days, ?) * 86400",
+                (default_retention_days, now, default_retention_days),
+            )
+            return [(row["channel_id"], row["message_id"]) for row in cursor]
+    except Exception:
+        logger.exception("Error getting expired messages", extra={"event": "db_get_expired_messages_failed"})
+        raise
+
+
+def delete_sent_messages(message_ids: list[tuple[str, str]]) -> None:
+    try:
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("DELETE FROM sent_messages WHERE channel_id = ? AND message_id = ?", message_ids)
+        logger.info("Sent messages forgotten", extra={"event": "db_sent_messages_deleted", "message_count": len(message_ids)})
+    except Exception:
+        logger.exception("Error deleting sent messages", extra={"event": "db_sent_messages_delete_failed", "message_count": len(message_ids)})
+        raise
+
+
 def update_user_playlist_id(user: User, playlist_id: str) -> None:
     try:
-        with connect(USERS_DB) as conn:
+        with connect_db() as conn:
             cursor = conn.cursor()
-            cursor.execute("UPDATE users SET playlist_id = ? WHERE user_UUID = ?", (playlist_id, user.user_UUID))
+            cursor.execute(
+                "UPDATE users SET playlist_id = ?, playlist_snapshot_id = NULL, playlist_validated_at = NULL WHERE user_UUID = ?",
+                (playlist_id, user.user_UUID),
+            )
             updated_count = cursor.rowcount
+        user.playlist_snapshot_id = None
+        user.playlist_validated_at = None
         logger.info("User playlist ID updated", extra={"event": "db_playlist_id_updated", "updated_count": updated_count, **user.log_context()})
     except Exception:
         logger.exception("Error updating user playlist ID", extra={"event": "db_playlist_id_update_failed", **user.log_context()})
         raise
 
 
+def update_user_playlist_snapshot(user: User, snapshot_id: str, validated: bool = False) -> None:
+    try:
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            if validated:
+                validated_at = datetime.now(timezone.utc).isoformat()
+                cursor.execute(
+                    "UPDATE users SET playlist_snapshot_id = ?, playlist_validated_at = ? WHERE user_UUID = ?",
+                    (snapshot_id, validated_at, user.user_UUID),
+                )
+                user.playlist_validated_at = validated_at
+            else:
+                cursor.execute("UPDATE users SET playlist_snapshot_id = ? WHERE user_UUID = ?", (snapshot_id, user.user_UUID))
+            updated_count = cursor.rowcount
+        user.playlist_snapshot_id = snapshot_id
+        logger.info(
+            "User playlist snapshot updated",
+            extra={"event": "db_playlist_snapshot_updated", "updated_count": updated_count, "validated": validated, **user.log_context()},
+        )
+    except Exception:
+        logger.exception("Error updating user playlist snapshot", extra={"event": "db_playlist_snapshot_update_failed", **user.log_context()})
+        raise
+
+
+def clear_user_playlist_validation(user: User) -> None:
+    try:
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE users SET playlist_validated_at = NULL WHERE user_UUID = ?", (user.user_UUID,))
+        user.playlist_validated_at = None
+        logger.info("User playlist validation cleared", extra={"event": "db_playlist_validation_cleared", **user.log_context()})
+    except Exception:
+        logger.exception("Error clearing user playlist validation", extra={"event": "db_playlist_validation_clear_failed", **user.log_context()})
+        raise
+
+
 def update_user_items(user: User) -> None:
     try:
-        with connect(USERS_DB) as conn:
+        with connect_db() as conn:
             cursor = conn.cursor()
             cursor.execute("UPDATE users SET user_items = ? WHERE user_UUID = ?", (user.get_items_json(), user.user_UUID))
             updated_count = cursor.rowcount
@@ -201,12 +453,12 @@ def update_user_items(user: User) -> None:
 
 def get_user_by_discord_username(discord_username: str) -> User | None:
     try:
-        with connect(USERS_DB) as conn:
+        with connect_db() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM users WHERE discord_username = ?", (discord_username,))
             user = cursor.fetchone()
         if user:
-            return User(user[0], user[1], user[2], user[3], user[4], user[5], user[6])
+            return User.from_row(user)
         return None
     except Exception:
         logger.exception(
@@ -218,36 +470,430 @@ def get_user_by_discord_username(discord_username: str) -> User | None:
 
 def get_user_by_username(username: str) -> User | None:
     try:
-        with connect(USERS_DB) as conn:
+        with connect_db() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
             user = cursor.fetchone()
         if user:
-            return User(user[0], user[1], user[2], user[3], user[4], user[5], user[6])
+            return User.from_row(user)
         return None
     except Exception:
         logger.exception("Error getting user by username", extra={"event": "db_get_user_by_username_failed", "username": username})
         raise
 
 
+def get_artist_stats(artist_ids: list[str]) -> dict[str, dict]:
+    stats = {}
+    try:
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(artist_ids), SQL_BATCH_SIZE):
+                batch = artist_ids[start : start + SQL_BATCH_SIZE]
+                placeholders = ", ".join("?" for _ in batch)
+                cursor.execute(
+                    f"SELECT artist_id, album_total, fetch_depth, last_release_date, total_checked_at FROM artist_stats WHERE artist_id IN ({placeholders})",
+                    batch,
+                )
+                for artist_id, album_total, fetch_depth, last_release_date, total_checked_at in cursor.fetchall():
+                    stats[artist_id] = {
+                        "album_total": album_total,
+                        "fetch_depth": fetch_depth,
+                        "last_release_date": last_release_date,
+                        "total_checked_at": total_checked_at,
+                    }
+        return stats
+    except Exception:
+        logger.exception("Error getting artist stats", extra={"event": "db_get_artist_stats_failed", "artist_count": len(artist_ids)})
+        raise
+
+
+def update_artist_stats(stats: dict[str, dict]) -> None:
+    try:
+        updated_at = datetime.now(timezone.utc).isoformat()
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                """
+                INSERT INTO artist_stats (artist_id, album_total, fetch_depth, last_release_date, updated_at, total_checked_at) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(artist_id) DO UPDATE SET
+                    album_total = COALESCE(excluded.album_total, album_total),
+                    fetch_depth = excluded.fetch_depth,
+                    last_release_date = NULLIF(MAX(COALESCE(excluded.last_release_date, ''), COALESCE(last_release_date, '')), ''),
+                    updated_at = excluded.updated_at,
+                    total_checked_at = COALESCE(excluded.total_checked_at, total_checked_at)
+                """,
+                [
+                    (
+                        artist_id,
+                        stat.get("album_total"),
+                        stat["fetch_depth"],
+                        stat.get("last_release_date"),
+                        updated_at,
+                        updated_at if stat.get("album_total") is not None else None,
+                    )
+                    for artist_id, stat in stats.items()
+                ],
+            )
+        logger.info("Artist stats updated", extra={"event": "db_artist_stats_updated", "artist_count": len(stats)})
+    except Exception:
+        logger.exception("Error updating artist stats", extra={"event": "db_artist_stats_update_failed", "artist_count": len(stats)})
+        raise
+
+
+def update_artist_baselines(baselines: dict[str, dict]) -> None:
+    try:
+        checked_at = datetime.now(timezone.utc).isoformat()
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                """
+                INSERT INTO artist_stats (artist_id, album_total, last_release_date, updated_at, total_checked_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(artist_id) DO UPDATE SET
+                    album_total = excluded.album_total,
+                    last_release_date = NULLIF(MAX(COALESCE(excluded.last_release_date, ''), COALESCE(last_release_date, '')), ''),
+                    total_checked_at = excluded.total_checked_at
+                """,
+                [
+                    (artist_id, baseline["album_total"], baseline.get("last_release_date"), checked_at, checked_at)
+                    for artist_id, baseline in baselines.items()
+                ],
+            )
+        logger.info("Artist baselines updated", extra={"event": "db_artist_baselines_updated", "artist_count": len(baselines)})
+    except Exception:
+        logger.exception("Error updating artist baselines", extra={"event": "db_artist_baselines_update_failed", "artist_count": len(baselines)})
+        raise
+
+
+def get_followed_artists(user: User) -> list[dict]:
+    try:
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT artist_id, artist_name FROM followed_artists WHERE user_UUID = ? ORDER BY position", (user.user_UUID,))
+            return [{"id": row["artist_id"], "name": row["artist_name"]} for row in cursor]
+    except Exception:
+        logger.exception("Error getting followed artists", extra={"event": "db_get_followed_artists_failed", **user.log_context()})
+        raise
+
+
+def replace_followed_artists(user: User, artists: list[dict]) -> None:
+    try:
+        synced_at = datetime.now(timezone.utc).isoformat()
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM followed_artists WHERE user_UUID = ?", (user.user_UUID,))
+            cursor.executemany(
+                "INSERT INTO followed_artists (user_UUID, position, artist_id, artist_name) VALUES (?, ?, ?, ?)",
+                ((user.user_UUID, position, artist["id"], artist["name"]) for position, artist in enumerate(artists)),
+            )
+            cursor.execute("UPDATE users SET artists_synced_at = ?, artists_checked_at = ? WHERE user_UUID = ?", (synced_at, synced_at, user.user_UUID))
+        user.artists_synced_at = synced_at
+        user.artists_checked_at = synced_at
+        logger.info("Followed artists updated", extra={"event": "db_followed_artists_updated", "artist_count": len(artists), **user.log_context()})
+    except Exception:
+        logger.exception("Error updating followed artists", extra={"event": "db_followed_artists_update_failed", **user.log_context()})
+        raise
+
+
+def mark_followed_artists_checked(user: User) -> None:
+    try:
+        checked_at = datetime.now(timezone.utc).isoformat()
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE users SET artists_checked_at = ? WHERE user_UUID = ?", (checked_at, user.user_UUID))
+        user.artists_checked_at = checked_at
+    except Exception:
+        logger.exception("Error marking followed artists checked", extra={"event": "db_followed_artists_check_failed", **user.log_context()})
+        raise
+
+
+def get_watch_candidates(since_date: str) -> dict[str, dict]:
+    candidates = {}
+    try:
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT s.artist_id, s.album_total, s.fetch_depth, s.last_release_date, s.total_checked_at, f.artist_name, f.user_UUID "
+                "FROM artist_stats s JOIN followed_artists f ON f.artist_id = s.artist_id WHERE s.last_release_date >= ?",
+                (since_date,),
+            )
+            for row in cursor:
+                candidate = candidates.setdefault(row["artist_id"], {
+                    "name": row["artist_name"],
+                    "stats": {
+                        "album_total": row["album_total"],
+                        "fetch_depth": row["fetch_depth"],
+                        "last_release_date": row["last_release_date"],
+                        "total_checked_at": row["total_checked_at"],
+                    },
+                    "user_UUIDs": [],
+                })
+                candidate["user_UUIDs"].append(row["user_UUID"])
+        return candidates
+    except Exception:
+        logger.exception("Error getting watch candidates", extra={"event": "db_get_watch_candidates_failed", "since_date": since_date})
+        raise
+
+
+def get_watch_request_count(since: str) -> int:
+    try:
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COALESCE(SUM(request_count), 0) FROM watch_runs WHERE started_at >= ?", (since,))
+            return cursor.fetchone()[0]
+    except Exception:
+        logger.exception("Error getting watch request count", extra={"event": "db_get_watch_request_count_failed"})
+        raise
+
+
+def record_watch_run(started_at: str, request_count: int, artist_count: int, release_count: int) -> None:
+    try:
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO watch_runs (started_at, request_count, artist_count, release_count) VALUES (?, ?, ?, ?)",
+                (started_at, request_count, artist_count, release_count),
+            )
+        logger.info(
+            "Watch run recorded",
+            extra={"event": "db_watch_run_recorded", "request_count": request_count, "artist_count": artist_count, "release_count": release_count},
+        )
+    except Exception:
+        logger.exception("Error recording watch run", extra={"event": "db_watch_run_record_failed"})
+        raise
+
+
+def record_run(run: dict, stages: dict[str, tuple[int, float]]) -> None:
+    try:
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT OR REPLACE INTO runs (run_id, mode, status, started_at, finished_at, duration_seconds, user_count, failed_user_count, request_count, rate_limited_count, cache_hit_rates) "
+                "VALUES (:run_id, :mode, :status, :started_at, :finished_at, :duration_seconds, :user_count, :failed_user_count, :request_count, :rate_limited_count, :cache_hit_rates)",
+                {**run, "cache_hit_rates": json.dumps(run["cache_hit_rates"])},
+            )
+            cursor.execute("DELETE FROM run_stages WHERE run_id = ?", (run["run_id"],))
+            cursor.executemany(
+                "INSERT INTO run_stages (run_id, stage, span_count, duration_seconds) VALUES (?, ?, ?, ?)",
+                ((run["run_id"], stage, span_count, round(duration_seconds, 6)) for stage, (span_count, duration_seconds) in stages.items()),
+            )
+        logger.info("Notifier run recorded", extra={"event": "db_run_recorded", "run_id": run["run_id"], "mode": run["mode"], "status": run["status"]})
+    except Exception:
+        logger.exception("Error recording notifier run", extra={"event": "db_run_record_failed", "run_id": run.get("run_id")})
+        raise
+
+
+def get_run_summary(recent_limit: int = 20) -> dict:
+    try:
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT * FROM runs r WHERE started_at = (SELECT MAX(started_at) FROM runs WHERE mode = r.mode) ORDER BY mode"
+            )
+            latest = [dict(row) for row in cursor.fetchall()]
+            cursor.execute("SELECT * FROM runs ORDER BY started_at DESC LIMIT ?", (recent_limit,))
+            recent = [dict(row) for row in cursor.fetchall()]
+            cursor.execute("SELECT mode, status, COUNT(*) AS run_count FROM runs GROUP BY mode, status ORDER BY mode, status")
+            run_counts = [dict(row) for row in cursor.fetchall()]
+            stages: dict[str, dict] = {run["run_id"]: {} for run in latest}
+            if stages:
+                cursor.execute(
+                    f"SELECT * FROM run_stages WHERE run_id IN ({','.join('?' for _ in stages)})",
+                    list(stages),
+                )
+                for row in cursor.fetchall():
+                    stages[row["run_id"]][row["stage"]] = {"span_count": row["span_count"], "duration_seconds": row["duration_seconds"]}
+        for run in latest + recent:
+            run["cache_hit_rates"] = json.loads(run["cache_hit_rates"] or "{}")
+        for run in latest:
+            run["stages"] = stages[run["run_id"]]
+        return {"latest_runs": latest, "recent_runs": recent, "run_counts": run_counts}
+    except Exception:
+        logger.exception("Error getting run summary", extra={"event": "db_get_run_summary_failed"})
+        raise
+
+
+def get_user_stats() -> dict[str, dict]:
+    try:
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT user_UUID, artist_count, request_count, duration_seconds FROM user_stats")
+            return {
+                row["user_UUID"]: {
+                    "artist_count": row["artist_count"],
+                    "request_count": row["request_count"],
+                    "duration_seconds": row["duration_seconds"],
+                }
+                for row in cursor
+            }
+    except Exception:
+        logger.exception("Error getting user stats", extra={"event": "db_get_user_stats_failed"})
+        raise
+
+
+def update_user_stats(user: User, artist_count: int | None, request_count: int, duration_seconds: float | None) -> None:
+    try:
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO user_stats (user_UUID, artist_count, request_count, duration_seconds, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(user_UUID) DO UPDATE SET artist_count = COALESCE(excluded.artist_count, artist_count), "
+                "request_count = excluded.request_count, duration_seconds = COALESCE(excluded.duration_seconds, duration_seconds), updated_at = excluded.updated_at",
+                (user.user_UUID, artist_count, request_count, duration_seconds, datetime.now(timezone.utc).isoformat()),
+            )
+        logger.info(
+            "User stats updated",
+            extra={
+                "event": "db_user_stats_updated",
+                "artist_count": artist_count,
+                "request_count": request_count,
+                "duration_seconds": duration_seconds,
+                **user.log_context(),
+            },
+        )
+    except Exception:
+        logger.exception("Error updating user stats", extra={"event": "db_user_stats_update_failed", **user.log_context()})
+        raise
+
+
+def get_playlist_tracks(playlist_id: str) -> tuple[str | None, set[str]]:
+    try:
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT snapshot_id FROM playlist_sync WHERE playlist_id = ?", (playlist_id,))
+            sync = cursor.fetchone()
+            if not sync:
+                return None, set()
+            cursor.execute("SELECT track_uri FROM playlist_tracks WHERE playlist_id = ?", (playlist_id,))
+            return sync["snapshot_id"], {row["track_uri"] for row in cursor}
+    except Exception:
+        logger.exception("Error getting playlist tracks", extra={"event": "db_get_playlist_tracks_failed", "playlist_id": playlist_id})
+        raise
+
+
+def update_playlist_tracks(playlist_id: str, snapshot_id: str, track_uris: set[str] | list[str], replace: bool = False) -> None:
+    try:
+        with connect_db() as conn:
+            cursor = conn.cursor()
+            if replace:
+                cursor.execute("DELETE FROM playlist_tracks WHERE playlist_id = ?", (playlist_id,))
+            cursor.executemany(
+                "INSERT OR IGNORE INTO playlist_tracks (playlist_id, track_uri) VALUES (?, ?)",
+                ((playlist_id, track_uri) for track_uri in track_uris),
+            )
+            cursor.execute(
+                "INSERT INTO playlist_sync (playlist_id, snapshot_id, synced_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(playlist_id) DO UPDATE SET snapshot_id = excluded.snapshot_id, synced_at = excluded.synced_at",
+                (playlist_id, snapshot_id, datetime.now(timezone.utc).isoformat()),
+            )
+        logger.info(
+            "Playlist tracks updated",
+            extra={"event": "db_playlist_tracks_updated", "playlist_id": playlist_id, "track_count": len(track_uris), "replace": replace},
+        )
+    except Exception:
+        logger.exception("Error updating playlist tracks", extra={"event": "db_playlist_tracks_update_failed", "playlist_id": playlist_id})
+        raise
+
+
 def scan_users() -> None:
     try:
-        with connect(USERS_DB) as conn:
+        with connect_db() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM users")
             users = cursor.fetchall()
         logger.info("Users scanned", extra={"event": "db_users_scanned", "user_count": len(users)})
         for user in users:
-            scanned_user = User(user[0], user[1], user[2], user[3], user[4], user[5], user[6])
+            scanned_user = User.from_row(user)
             logger.info("Scanned user", extra={"event": "db_user_scanned", **scanned_user.log_context()})
     except Exception:
         logger.exception("Error scanning users", extra={"event": "db_scan_users_failed"})
         raise
 
 
+def user_import_rows(lines, columns: list[str]) -> Generator[tuple, None, None]:
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if not record.get("user_UUID"):
+            record["user_UUID"] = str(uuid.uuid4())
+        # Missing keys stay None so an --update import leaves the stored value alone.
+        if record.get("user_items") is not None and not isinstance(record["user_items"], str):
+            record["user_items"] = json.dumps(list(record["user_items"]))
+        yield tuple(record.get(column) for column in columns)
+
+
+def import_update_clause(column: str) -> str:
+    if column in ("playlist_snapshot_id", "playlist_validated_at"):
+        # A new playlist_id makes the stored snapshot and validation meaningless unless the record brings its own.
+        return (
+            f"{column} = CASE WHEN excluded.playlist_id IS NOT NULL AND excluded.playlist_id IS NOT users.playlist_id "
+            f"THEN excluded.{column} ELSE COALESCE(excluded.{column}, users.{column}) END"
+        )
+    return f"{column} = COALESCE(excluded.{column}, users.{column})"
+
+
+def import_users(path: str, update_existing: bool = False) -> tuple[int, int]:
+    columns = USER_BASE_COLUMNS + list(USER_MIGRATION_COLUMNS)
+    # user_UUID is kept on conflict since other tables reference it, and columns the record leaves out keep their current value.
+    conflict = (
+        "DO UPDATE SET " + ", ".join(import_update_clause(column) for column in columns if column not in ("user_UUID", "username"))
+        if update_existing
+        else "DO NOTHING"
+    )
+    query = f"INSERT INTO users ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) ON CONFLICT (username) {conflict}"
+    username_index = columns.index("username")
+    playlist_index = columns.index("playlist_id")
+    replaced_playlist = "(SELECT playlist_id FROM users WHERE username = ? AND playlist_id IS NOT ?)"
+    read_count = 0
+    written_count = 0
+    try:
+        with open(path) as source, connect_db() as conn:
+            rows = user_import_rows(source, columns)
+            while batch := list(islice(rows, USER_IMPORT_BATCH_SIZE)):
+                if update_existing:
+                    # The known-track cache of a playlist being replaced would otherwise outlive it.
+                    moved = [(row[username_index], row[playlist_index]) for row in batch if row[playlist_index] is not None]
+                    conn.executemany(f"DELETE FROM playlist_tracks WHERE playlist_id = {replaced_playlist}", moved)
+                    conn.executemany(f"DELETE FROM playlist_sync WHERE playlist_id = {replaced_playlist}", moved)
+                # One transaction per batch keeps the journal small without paying a commit per user.
+                cursor = conn.executemany(query, batch)
+                conn.commit()
+                read_count += len(batch)
+                written_count += cursor.rowcount
+                logger.info("User import batch committed", extra={"event": "db_user_import_batch", "user_count": read_count})
+        logger.info(
+            "Users imported",
+            extra={"event": "db_users_imported", "path": path, "user_count": read_count, "written_count": written_count, "update_existing": update_existing},
+        )
+        return read_count, written_count
+    except Exception:
+        logger.exception("Error importing users", extra={"event": "db_users_import_failed", "path": path, "user_count": read_count})
+        raise
+
+
+def export_users(path: str) -> int:
+    user_count = 0
+    try:
+        with open(path, "w") as target, connect_db() as conn:
+            # The cursor is iterated directly so only one row is held in memory at a time.
+            for row in conn.execute("SELECT * FROM users"):
+                record = dict(row)
+                try:
+                    record["user_items"] = json.loads(record["user_items"] or "[]")
+                except json.JSONDecodeError:
+                    record["user_items"] = []
+                target.write(json.dumps(record) + "\n")
+                user_count += 1
+        logger.info("Users exported", extra={"event": "db_users_exported", "path": path, "user_count": user_count})
+        return user_count
+    except Exception:
+        logger.exception("Error exporting users", extra={"event": "db_users_export_failed", "path": path})
+        raise
+
+
 def data_migration():
     try:
-        with connect(USERS_DB) as conn:
+        with connect_db() as conn:
             cursor = conn.cursor()
             cursor.execute("PRAGMA table_info(users)")
             columns = [column[1] for column in cursor.fetchall()]
@@ -258,6 +904,9 @@ def data_migration():
                 logger.info("Added user_items column", extra={"event": "db_user_items_migration_succeeded"})
             else:
                 logger.info("user_items column already exists", extra={"event": "db_user_items_migration_skipped"})
+            add_missing_user_columns(cursor)
+            add_username_index(cursor)
+            add_missing_columns(cursor, "artist_stats", ARTIST_STATS_MIGRATION_COLUMNS)
     except Exception:
         logger.exception("Error during data migration", extra={"event": "db_data_migration_failed"})
         raise
@@ -270,5 +919,11 @@ if __name__ == "__main__":
             scan_users()
         elif sys.argv[1] == "data_migration":
             data_migration()
+        elif sys.argv[1] == "import" and len(sys.argv) > 2:
+            import_users(sys.argv[2], update_existing="--update" in sys.argv[3:])
+        elif sys.argv[1] == "export" and len(sys.argv) > 2:
+            export_users(sys.argv[2])
+        else:
+            logger.info("Usage: python sql.py [scan | data_migration | import <file.jsonl> [--update] | export <file.jsonl>]", extra={"event": "db_cli_usage"})
     else:
-        logger.info("Usage: python sql.py [scan | data_migration]", extra={"event": "db_cli_usage"})
+        logger.info("Usage: python sql.py [scan | data_migration | import <file.jsonl> [--update] | export <file.jsonl>]", extra={"event": "db_cli_usage"})
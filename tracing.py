@@ -0,0 +1,138 @@
+import asyncio
+import atexit
+import contextvars
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+TRACE_OUTPUT = os.getenv("TRACE_OUTPUT")
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("current_span", default=None)
+_span_ids = itertools.count(1)
+_lane_ids = itertools.count(1)
+_task_lanes: "weakref.WeakKeyDictionary[asyncio.Task, int]" = weakref.WeakKeyDictionary()
+_thread_lanes: dict[int, int] = {}
+_lane_lock = threading.Lock()
+_trace_started_at = time.perf_counter()
+finished_spans: list["Span"] = []
+# Per span name: [finished spans, total seconds]. Kept even without TRACE_OUTPUT so runs can record stage timings.
+span_totals: dict[str, list] = defaultdict(lambda: [0, 0.0])
+
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    span_id: int
+    parent_id: int | None
+    lane: int
+    started_at: float
+    ended_at: float | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    @property
+    def duration_seconds(self) -> float:
+        return (self.ended_at or time.perf_counter()) - self.started_at
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def task_lane() -> int:
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is None:
+        # Worker threads (asyncio.to_thread) run beside the event loop, so each one gets its own lane too.
+        if threading.current_thread() is threading.main_thread():
+            return 0
+        thread_id = threading.get_ident()
+        with _lane_lock:
+            if thread_id not in _thread_lanes:
+                _thread_lanes[thread_id] = next(_lane_ids)
+            return _thread_lanes[thread_id]
+    # Each asyncio task gets its own lane so concurrent spans never overlap within one trace row.
+    with _lane_lock:
+        if task not in _task_lanes:
+            _task_lanes[task] = next(_lane_ids)
+        return _task_lanes[task]
+
+
+@contextmanager
+def span(name: str, log_level: int = logging.INFO, **attributes: Any) -> Iterator[Span]:
+    parent = _current_span.get()
+    current = Span(name, next(_span_ids), parent.span_id if parent else None, task_lane(), time.perf_counter(), attributes=attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.attributes["error_type"] = type(e).__name__
+        raise
+    finally:
+        current.ended_at = time.perf_counter()
+        _current_span.reset(token)
+        totals = span_totals[current.name]
+        totals[0] += 1
+        totals[1] += current.duration_seconds
+        if TRACE_OUTPUT:
+            finished_spans.append(current)
+        if logger.isEnabledFor(log_level):
+            logger.log(
+                log_level,
+                "Span finished",
+                extra={
+                    "event": "trace_span",
+                    "span_name": current.name,
+                    "span_id": current.span_id,
+                    "parent_span_id": current.parent_id,
+                    "duration_seconds": round(current.duration_seconds, 6),
+                    "attributes": current.attributes,
+                },
+            )
+
+
+def chrome_trace_events(spans: list[Span]) -> list[dict[str, Any]]:
+    return [
+        {
+            "name": span.name,
+            "cat": span.name,
+            "ph": "X",
+            "ts": round((span.started_at - _trace_started_at) * 1_000_000, 3),
+            "dur": round(span.duration_seconds * 1_000_000, 3),
+            "pid": os.getpid(),
+            "tid": span.lane,
+            "args": {"span_id": span.span_id, "parent_span_id": span.parent_id, **span.attributes},
+        }
+        for span in spans
+    ]
+
+
+def export_chrome_trace(path: str | None = None) -> None:
+    path = path or TRACE_OUTPUT
+    if not path or not finished_spans:
+        return
+    try:
+        with open(path, "w") as trace_file:
+            json.dump({"traceEvents": chrome_trace_events(finished_spans), "displayTimeUnit": "ms"}, trace_file, default=str)
+        logger.info("Trace exported", extra={"event": "trace_exported", "path": path, "span_count": len(finished_spans)})
+    except OSError:
+        logger.exception("Trace export failed", extra={"event": "trace_export_failed", "path": path})
+
+
+atexit.register(export_chrome_trace)